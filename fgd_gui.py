@@ -6,6 +6,8 @@ import os
 import re
 import traceback
 import copy
+from collections import deque, OrderedDict
+from functools import partial
 
 # Import the core logic modules
 from fgd_parser import FGDParser
@@ -30,6 +32,25 @@ EDITOR_HELPERS = sorted([
     "sun", "sweptplayerhull", "vecline", "wirebox", "worldtext", "worldtextvgui"
 ])
 
+# Number of detail-pane rows (section headers, keyvalues, inputs, outputs) built at once.
+# Rows past the first batch are only materialized as the user scrolls toward them.
+DETAIL_ROW_BATCH = 40
+# Delay (ms) before rebuilding the detail pane after a selection change, so holding an
+# arrow key in the elements list only renders the element the selection settles on.
+DETAIL_DISPLAY_DELAY_MS = 30
+# Maximum number of per-element detail frames kept alive for reuse when re-selecting.
+DETAIL_FRAME_CACHE_SIZE = 16
+# Bind tag shared by every detail-pane field that writes straight back to a model attribute.
+FIELD_BINDTAG = "FGDField"
+
+
+def _int_or_zero(text: str) -> int:
+    return int(text or 0)
+
+
+def _toggle_attr(obj, attr: str, var: tk.BooleanVar):
+    setattr(obj, attr, var.get())
+
 
 class InputDialog(simpledialog.Dialog):
     """A generic dialog for creating items with multiple fields, including comboboxes."""
@@ -75,17 +96,36 @@ class FGDApplication(tk.Tk):
         self.selected_element: FGDElement | None = None
         self.properties_frame_inner_id = None
         self.clipboard_element: FGDElement | None = None
+        self._scrollregion_pending = False
+        self._canvas_width_pending: int | None = None
+        self._pending_detail_rows: deque = deque()
+        self._detail_rows_scheduled = False
+        self._pending_display_job = None
+        # id(element) -> (element, frame, pending rows), least recently shown first.
+        self._detail_frame_cache: OrderedDict[int, tuple] = OrderedDict()
+        self._current_detail_frame: ttk.Frame | None = None
+        self._paste_counters: dict[str, int] = {} # Next "_pasteN" suffix to try per class name
+        self._expanded_props: set[int] = set() # id() of properties whose choices/flags are shown
+        self._committed_text_hashes: dict[int, tuple] = {} # id(element) -> (element, hash of the last multi-line text applied to it)
+        self._next_item_id = 0 # Suffix for Treeview IIDs of rows added after the last full rebuild
+        self._field_bindtags: dict[type, tuple] = {} # Widget type -> default bindtags after the widget's own path
 
         self.parser = FGDParser()
         self.serializer = FGDSerializer()
+        # Widget class (winfo_class) -> clipboard handlers that replace the widget's own <<Cut>>/<<Copy>>/<<Paste>>
+        self._clipboard_actions = {
+            "Treeview": {"cut": self._cut_element, "copy": self._copy_element, "paste": self._paste_element},
+        }
 
         theme.setup_theme(self)
 
         self._create_widgets()
         self._setup_menu()
         self._bind_hotkeys()
+        self.bind_class(FIELD_BINDTAG, "<FocusOut>", self._on_field_focus_out)
 
         theme.switch_theme(self, dark_mode=True)
+        self._refresh_text_colors()
 
     def _create_widgets(self):
         self.main_pane = ttk.PanedWindow(self, orient=tk.HORIZONTAL)
@@ -149,7 +189,7 @@ class FGDApplication(tk.Tk):
     def _create_properties_and_io_frame(self):
         self.properties_canvas = tk.Canvas(self.properties_frame, bd=0, highlightthickness=0)
         self.properties_scrollbar = ttk.Scrollbar(self.properties_frame, orient="vertical", command=self.properties_canvas.yview)
-        self.properties_canvas.configure(yscrollcommand=self.properties_scrollbar.set)
+        self.properties_canvas.configure(yscrollcommand=self._on_properties_yscroll)
 
         self.properties_canvas.pack(side="left", fill="both", expand=True)
         self.properties_scrollbar.pack(side="right", fill="y")
@@ -157,8 +197,41 @@ class FGDApplication(tk.Tk):
         self.properties_frame_inner = ttk.Frame(self.properties_canvas)
         self.properties_frame_inner_id = self.properties_canvas.create_window((0, 0), window=self.properties_frame_inner, anchor="nw")
 
-        self.properties_frame_inner.bind("<Configure>", lambda e: self.properties_canvas.configure(scrollregion=self.properties_canvas.bbox("all")))
-        self.properties_canvas.bind('<Configure>', lambda e: self.properties_canvas.itemconfig(self.properties_frame_inner_id, width=e.width))
+        # Every widget gridded into the inner frame fires <Configure>, so coalesce the
+        # expensive bbox("all") scan (and the width sync) into a single idle callback.
+        self.properties_frame_inner.bind("<Configure>", self._on_properties_inner_configure)
+        self.properties_canvas.bind('<Configure>', self._on_properties_canvas_configure)
+
+    def _on_properties_inner_configure(self, event=None):
+        if not self._scrollregion_pending:
+            self._scrollregion_pending = True
+            self.after_idle(self._recompute_scrollregion)
+
+    def _recompute_scrollregion(self):
+        self._scrollregion_pending = False
+        self.properties_canvas.configure(scrollregion=self.properties_canvas.bbox("all"))
+
+    def _on_properties_yscroll(self, first, last):
+        self.properties_scrollbar.set(first, last)
+        # Build the next batch of detail rows once the viewport nears the end of what exists.
+        if self._pending_detail_rows and float(last) >= 0.9 and not self._detail_rows_scheduled:
+            self._detail_rows_scheduled = True
+            self.after_idle(self._render_pending_detail_rows)
+
+    def _render_pending_detail_rows(self):
+        self._detail_rows_scheduled = False
+        pending = self._pending_detail_rows
+        for _ in range(min(DETAIL_ROW_BATCH, len(pending))):
+            pending.popleft()()
+
+    def _on_properties_canvas_configure(self, event):
+        if self._canvas_width_pending is None:
+            self.after_idle(self._apply_canvas_width)
+        self._canvas_width_pending = event.width
+
+    def _apply_canvas_width(self):
+        width, self._canvas_width_pending = self._canvas_width_pending, None
+        self.properties_canvas.itemconfig(self.properties_frame_inner_id, width=width)
 
     def _setup_menu(self):
         self.menubar = tk.Menu(self, tearoff=0)
@@ -190,6 +263,9 @@ class FGDApplication(tk.Tk):
         self.menubar.add_cascade(label="Help", menu=help_menu)
         help_menu.add_command(label="About", command=self.show_about_window)
 
+        # Kept so theme switches can restyle the menus without querying the menubar for them
+        self.cascade_menus = (file_menu, edit_menu, theme_menu, help_menu)
+
     def _bind_hotkeys(self):
         self.bind_all("<Control-n>", lambda e: self._new_fgd_file())
         self.bind_all("<Control-o>", lambda e: self._open_fgd_file())
@@ -207,10 +283,13 @@ class FGDApplication(tk.Tk):
             self._save_fgd_file()
         
         self.fgd_file = FGDFile()
+        self._paste_counters.clear()
+        self._expanded_props.clear()
+        self._committed_text_hashes.clear()
         self.current_fgd_path = None
         self.title("Entity Forge - New File")
         self._update_elements_list()
-        self._clear_properties_frame()
+        self._clear_detail_frame_cache()
 
     def _add_entity_class(self):
         if not self.fgd_file:
@@ -227,8 +306,7 @@ class FGDApplication(tk.Tk):
 
         new_element = EntityClass(class_type="PointClass", name=clean_name, description="A new entity class.")
         self.fgd_file.add_element(new_element)
-        self._update_elements_list()
-        self._select_element_in_tree(new_element.name)
+        self._select_element_in_tree(new_element, self._insert_element_row(new_element))
 
     def _add_directive(self, directive_type: str):
         if not self.fgd_file:
@@ -258,8 +336,7 @@ class FGDApplication(tk.Tk):
         
         if new_element:
             self.fgd_file.add_element(new_element)
-            self._update_elements_list()
-            self._select_element_in_tree(new_element.name)
+            self._select_element_in_tree(new_element, self._insert_element_row(new_element))
 
     def _delete_selected_element(self):
         selected_ids = self.elements_list.selection()
@@ -276,19 +353,25 @@ class FGDApplication(tk.Tk):
 
         if element_to_delete:
             self.fgd_file.remove_element(element_to_delete)
-            self._update_elements_list()
+            self.elements_list.delete(selected_id)
+            self._committed_text_hashes.pop(id(element_to_delete), None)
+            if isinstance(element_to_delete, EntityClass):
+                self._paste_counters.clear() # Deleting a class can free up previously used suffixes
+            self._invalidate_detail_frame(element_to_delete)
             self._clear_properties_frame()
 
     def _open_fgd_file(self):
         filepath = filedialog.askopenfilename(filetypes=[("FGD Files", "*.fgd"), ("All Files", "*.*")])
         if filepath:
             try:
-                self.parser = FGDParser()
                 self.fgd_file = self.parser.parse_fgd_file(filepath)
+                self._paste_counters.clear()
+                self._expanded_props.clear()
+                self._committed_text_hashes.clear()
                 self.current_fgd_path = filepath
                 self.title(f"Entity Forge - {os.path.basename(filepath)}")
                 self._update_elements_list()
-                self._clear_properties_frame()
+                self._clear_detail_frame_cache()
             except Exception as e:
                 traceback.print_exc()
                 messagebox.showerror("Load Error", f"Failed to load FGD file: {e}")
@@ -296,7 +379,7 @@ class FGDApplication(tk.Tk):
                 self.current_fgd_path = None
                 self.title("Entity Forge")
                 self._update_elements_list()
-                self._clear_properties_frame()
+                self._clear_detail_frame_cache()
 
     def _save_fgd_file(self):
         if not self.current_fgd_path:
@@ -322,9 +405,17 @@ class FGDApplication(tk.Tk):
                 focused_widget.event_generate("<FocusOut>")
                 self.update_idletasks()
 
-            serialized_content = self.serializer.serialize_fgd(self.fgd_file)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(serialized_content)
+            # Stream into a temporary file next to the target and swap it in, so a failure
+            # partway through serialization never leaves a truncated FGD behind.
+            temp_path = filepath + '.tmp'
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    self.serializer.serialize_fgd_to(self.fgd_file, f)
+                os.replace(temp_path, filepath)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
             self.current_fgd_path = filepath
             self.title(f"Entity Forge - {os.path.basename(filepath)}")
             messagebox.showinfo("Save Successful", f"File saved to {os.path.basename(filepath)}")
@@ -341,14 +432,21 @@ class FGDApplication(tk.Tk):
             self.elements_list.delete(iid)
             
         if self.fgd_file:
+            insert = self.elements_list.insert
+            id_map = self.fgd_file.element_id_map
+            failed = 0
             for i, element in enumerate(self.fgd_file.elements):
                 element_id = f"item_{i}"
-                self.fgd_file.element_id_map[element_id] = element
+                id_map[element_id] = element
+                class_type = element.class_type
                 try:
-                    self.elements_list.insert("", "end", iid=element_id, text=str(element.name), values=(element.class_type,))
+                    insert("", "end", iid=element_id, text=element.name, values=(class_type,))
                 except tk.TclError as e:
-                    print(f"Error adding element to Treeview: {e}. Element: {element.name}, Type: {element.class_type}")
-                    messagebox.showerror("GUI Error", f"Failed to display an FGD element. Check terminal for details.")
+                    print(f"Error adding element to Treeview: {e}. Element: {element.name}, Type: {class_type}")
+                    failed += 1
+            if failed:
+                messagebox.showerror("GUI Error", f"Failed to display {failed} FGD element(s). Check terminal for details.")
+            self._next_item_id = len(self.fgd_file.elements)
 
         if selection:
             try:
@@ -357,25 +455,55 @@ class FGDApplication(tk.Tk):
             except tk.TclError:
                 pass 
 
-    def _select_element_in_tree(self, element_name: str):
-        for iid in self.elements_list.get_children():
-            if self.elements_list.item(iid, "text") == element_name:
-                self.elements_list.selection_set(iid)
-                self.elements_list.focus(iid)
-                self.elements_list.see(iid)
-                return
+    def _insert_element_row(self, element: FGDElement, index="end") -> str:
+        """Adds a single Treeview row for an element that is already in the model."""
+        iid = f"item_{self._next_item_id}"
+        self._next_item_id += 1
+        self.fgd_file.element_id_map[iid] = element
+        self.elements_list.insert("", index, iid=iid, text=element.name, values=(element.class_type,))
+        return iid
+
+    def _refresh_element_row(self, element: FGDElement):
+        """Updates the name and type shown for an element without rebuilding the list."""
+        iid = self.fgd_file.get_id_by_element(element)
+        if iid:
+            self.elements_list.item(iid, text=element.name, values=(element.class_type,))
+
+    def _select_element_in_tree(self, element: FGDElement, iid: str | None = None):
+        iid = iid or self.fgd_file.get_id_by_element(element)
+        if iid:
+            self.elements_list.selection_set(iid)
+            self.elements_list.focus(iid)
+            self.elements_list.see(iid)
 
     def _on_element_select(self, event):
         selected_ids = self.elements_list.selection()
         if selected_ids:
             element = self.fgd_file.get_element_by_id(selected_ids[0])
-            self._display_element_details(element)
+            self._schedule_display(element)
         else:
+            self._cancel_scheduled_display()
             self._clear_properties_frame()
 
+    def _schedule_display(self, element: FGDElement | None):
+        self._cancel_scheduled_display()
+        self._pending_display_job = self.after(DETAIL_DISPLAY_DELAY_MS, self._run_scheduled_display, element)
+
+    def _run_scheduled_display(self, element: FGDElement | None):
+        self._pending_display_job = None
+        self._display_element_details(element)
+
+    def _cancel_scheduled_display(self):
+        if self._pending_display_job:
+            self.after_cancel(self._pending_display_job)
+            self._pending_display_job = None
+
     def _clear_properties_frame(self):
-        for widget in self.properties_frame_inner.winfo_children():
-            widget.destroy()
+        """Hides the current detail frame; cached frames stay alive for reuse."""
+        if self._current_detail_frame is not None:
+            self._current_detail_frame.pack_forget()
+            self._current_detail_frame = None
+        self._pending_detail_rows = deque()
         canvas_bg = self.style.lookup("TFrame", "background")
         self.properties_canvas.config(bg=canvas_bg)
 
@@ -386,66 +514,116 @@ class FGDApplication(tk.Tk):
         except tk.TclError:
             return fallback
 
+    def _refresh_text_colors(self):
+        """Caches the tk.Text colors for the active theme; call after every theme switch."""
+        self._text_fg = self._get_style_color("TEntry", "foreground", "black")
+        self._text_bg = self._get_style_color("TEntry", "fieldbackground", "white")
+        self._text_insert_color = self._get_style_color("TEntry", "insertcolor", self._text_fg)
+
+    def _invalidate_detail_frame(self, element: FGDElement | None):
+        cached = self._detail_frame_cache.pop(id(element), None)
+        if cached:
+            if cached[1] is self._current_detail_frame:
+                self._clear_properties_frame()
+            cached[1].destroy()
+
+    def _clear_detail_frame_cache(self):
+        self._clear_properties_frame()
+        for _, frame, _ in self._detail_frame_cache.values():
+            frame.destroy()
+        self._detail_frame_cache.clear()
+
+    def _rebuild_element_details(self, element: FGDElement | None):
+        """Discards any cached detail frame for the element and displays a fresh one."""
+        self._invalidate_detail_frame(element)
+        self._display_element_details(element)
+
     def _display_element_details(self, element: FGDElement | None):
+        self._cancel_scheduled_display()
         self._clear_properties_frame()
         self.selected_element = element
         if not element: return
 
-        text_fg = self._get_style_color("TEntry", "foreground", "black")
-        text_bg = self._get_style_color("TEntry", "fieldbackground", "white")
-        text_insert_color = self._get_style_color("TEntry", "insertcolor", text_fg)
+        cached = self._detail_frame_cache.get(id(element))
+        if cached and cached[0] is element:
+            self._detail_frame_cache.move_to_end(id(element))
+            _, frame, pending = cached
+        else:
+            if cached:
+                cached[1].destroy() # Stale entry left behind by a recycled id()
+            frame, pending = ttk.Frame(self.properties_frame_inner), deque()
+            self._detail_frame_cache[id(element)] = (element, frame, pending)
+            while len(self._detail_frame_cache) > DETAIL_FRAME_CACHE_SIZE:
+                _, (_, old_frame, _) = self._detail_frame_cache.popitem(last=False)
+                old_frame.destroy()
+            self._pending_detail_rows = pending
+            self._build_element_details(frame, element)
+
+        frame.pack(fill="both", expand=True)
+        self._current_detail_frame = frame
+        self._pending_detail_rows = pending
+
+        self.properties_frame_inner.update_idletasks()
+        self.properties_canvas.configure(scrollregion=self.properties_canvas.bbox("all"))
+
+    def _build_element_details(self, parent: ttk.Frame, element: FGDElement):
+        text_fg, text_bg, text_insert_color = self._text_fg, self._text_bg, self._text_insert_color
 
         if isinstance(element, IncludeDirective):
-            ttk.Label(self.properties_frame_inner, text="Include Path:", font="-weight bold").grid(row=0, column=0, padx=5, pady=5, sticky="w")
-            path_entry = ttk.Entry(self.properties_frame_inner)
+            ttk.Label(parent, text="Include Path:", font="-weight bold").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+            path_entry = ttk.Entry(parent)
             path_entry.insert(0, element.file_path)
             path_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
             path_entry.bind("<FocusOut>", lambda e, el=element: self._update_include_path(el, e.widget.get()))
 
         elif isinstance(element, MapSize):
-            ttk.Label(self.properties_frame_inner, text="Min Coordinate:", font="-weight bold").grid(row=0, column=0, padx=5, pady=5, sticky="w")
-            min_entry = ttk.Entry(self.properties_frame_inner, width=10)
+            ttk.Label(parent, text="Min Coordinate:", font="-weight bold").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+            min_entry = ttk.Entry(parent, width=10)
             min_entry.insert(0, str(element.min_coord))
             min_entry.grid(row=0, column=1, padx=5, pady=5, sticky="w")
             min_entry.bind("<FocusOut>", lambda e, el=element: self._update_mapsize(el, 'min', e.widget))
 
-            ttk.Label(self.properties_frame_inner, text="Max Coordinate:", font="-weight bold").grid(row=1, column=0, padx=5, pady=5, sticky="w")
-            max_entry = ttk.Entry(self.properties_frame_inner, width=10)
+            ttk.Label(parent, text="Max Coordinate:", font="-weight bold").grid(row=1, column=0, padx=5, pady=5, sticky="w")
+            max_entry = ttk.Entry(parent, width=10)
             max_entry.insert(0, str(element.max_coord))
             max_entry.grid(row=1, column=1, padx=5, pady=5, sticky="w")
             max_entry.bind("<FocusOut>", lambda e, el=element: self._update_mapsize(el, 'max', e.widget))
 
         elif isinstance(element, Version):
-            ttk.Label(self.properties_frame_inner, text="FGD Version:", font="-weight bold").grid(row=0, column=0, padx=5, pady=5, sticky="w")
-            ver_entry = ttk.Entry(self.properties_frame_inner, width=10)
+            ttk.Label(parent, text="FGD Version:", font="-weight bold").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+            ver_entry = ttk.Entry(parent, width=10)
             ver_entry.insert(0, str(element.version_number))
             ver_entry.grid(row=0, column=1, padx=5, pady=5, sticky="w")
             ver_entry.bind("<FocusOut>", lambda e, el=element: self._update_version(el, e.widget))
             
         elif isinstance(element, MaterialExclusion):
-            ttk.Label(self.properties_frame_inner, text="Excluded Paths:", font="-weight bold").grid(row=0, column=0, padx=5, pady=5, sticky="nw")
-            desc_label = ttk.Label(self.properties_frame_inner, text="(One full material path per line)")
+            ttk.Label(parent, text="Excluded Paths:", font="-weight bold").grid(row=0, column=0, padx=5, pady=5, sticky="nw")
+            desc_label = ttk.Label(parent, text="(One full material path per line)")
             desc_label.grid(row=1, column=0, columnspan=2, padx=5, pady=(0,5), sticky="w")
             
-            ex_text = tk.Text(self.properties_frame_inner, height=10, wrap="word",
+            # One path per line never needs wrapping; undo stays off for the bulk insert.
+            ex_text = tk.Text(parent, height=10, wrap="none",
+                              undo=False, autoseparators=False,
                               bg=text_bg, fg=text_fg, insertbackground=text_insert_color,
                               relief="flat", borderwidth=1, highlightthickness=0)
             ex_text.insert("1.0", "\n".join(element.excluded_paths))
+            ex_text.bind("<Key>", self._enable_text_undo)
             ex_text.grid(row=2, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
             ex_text.bind("<FocusOut>", lambda e, el=element: self._update_material_exclusion(el, e.widget.get("1.0", "end-1c")))
 
         elif isinstance(element, AutoVisGroup):
-            ttk.Label(self.properties_frame_inner, text="Parent Name:", font="-weight bold").grid(row=0, column=0, padx=5, pady=5, sticky="w")
-            parent_entry = ttk.Entry(self.properties_frame_inner)
+            ttk.Label(parent, text="Parent Name:", font="-weight bold").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+            parent_entry = ttk.Entry(parent)
             parent_entry.insert(0, element.parent_name)
             parent_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
             parent_entry.bind("<FocusOut>", lambda e, el=element: self._update_autovisgroup_parent(el, e.widget.get()))
 
-            ttk.Label(self.properties_frame_inner, text="Children:", font="-weight bold").grid(row=1, column=0, padx=5, pady=5, sticky="nw")
-            desc_label = ttk.Label(self.properties_frame_inner, text="(One entity or subgroup name per line)")
+            ttk.Label(parent, text="Children:", font="-weight bold").grid(row=1, column=0, padx=5, pady=5, sticky="nw")
+            desc_label = ttk.Label(parent, text="(One entity or subgroup name per line)")
             desc_label.grid(row=2, column=0, columnspan=2, padx=5, pady=(0,5), sticky="w")
             
-            child_text = tk.Text(self.properties_frame_inner, height=10, wrap="word",
+            child_text = tk.Text(parent, height=10, wrap="none",
+                                 undo=False, autoseparators=False,
                                  bg=text_bg, fg=text_fg, insertbackground=text_insert_color,
                                  relief="flat", borderwidth=1, highlightthickness=0)
             
@@ -457,28 +635,29 @@ class FGDApplication(tk.Tk):
                     child_text_content.append(f"[Sub-group: {child.parent_name}] (Not editable here)")
             
             child_text.insert("1.0", "\n".join(child_text_content))
+            child_text.bind("<Key>", self._enable_text_undo)
             child_text.grid(row=3, column=0, columnspan=2, sticky="nsew", padx=5, pady=5)
             child_text.bind("<FocusOut>", lambda e, el=element: self._update_autovisgroup_children(el, e.widget.get("1.0", "end-1c")))
 
         elif isinstance(element, EntityClass):
             row = 0
-            ttk.Label(self.properties_frame_inner, text="Class Name:").grid(row=row, column=0, padx=5, pady=2, sticky="w")
-            name_entry = ttk.Entry(self.properties_frame_inner)
+            ttk.Label(parent, text="Class Name:").grid(row=row, column=0, padx=5, pady=2, sticky="w")
+            name_entry = ttk.Entry(parent)
             name_entry.insert(0, element.name)
             name_entry.grid(row=row, column=1, padx=5, pady=2, sticky="ew")
             name_entry.bind("<FocusOut>", lambda e: self._update_element_name(element, name_entry.get()))
             row += 1
 
-            ttk.Label(self.properties_frame_inner, text="Class Type:").grid(row=row, column=0, padx=5, pady=2, sticky="w")
+            ttk.Label(parent, text="Class Type:").grid(row=row, column=0, padx=5, pady=2, sticky="w")
             types = ["PointClass", "SolidClass", "NPCClass", "KeyframeClass", "MoveClass", "FilterClass", "ExtendClass", "BaseClass"]
-            type_combo = ttk.Combobox(self.properties_frame_inner, values=types, state="readonly")
+            type_combo = ttk.Combobox(parent, values=types, state="readonly")
             type_combo.set(element.class_type)
             type_combo.grid(row=row, column=1, padx=5, pady=2, sticky="ew")
             type_combo.bind("<<ComboboxSelected>>", lambda e: self._update_class_type(element, type_combo.get()))
             row += 1
 
-            ttk.Label(self.properties_frame_inner, text="Description:").grid(row=row, column=0, padx=5, pady=2, sticky="nw")
-            desc_text = tk.Text(self.properties_frame_inner, height=3, wrap="word",
+            ttk.Label(parent, text="Description:").grid(row=row, column=0, padx=5, pady=2, sticky="nw")
+            desc_text = tk.Text(parent, height=3, wrap="word",
                                 bg=text_bg, fg=text_fg, insertbackground=text_insert_color,
                                 relief="flat", borderwidth=1, highlightthickness=0)
             desc_text.insert("1.0", element.description)
@@ -486,8 +665,8 @@ class FGDApplication(tk.Tk):
             desc_text.bind("<FocusOut>", lambda e: self._update_element_description(element, desc_text.get("1.0", "end-1c")))
             row += 1
 
-            ttk.Label(self.properties_frame_inner, text="Base Classes:").grid(row=row, column=0, padx=5, pady=2, sticky="nw")
-            base_text = tk.Text(self.properties_frame_inner, height=2, wrap="word",
+            ttk.Label(parent, text="Base Classes:").grid(row=row, column=0, padx=5, pady=2, sticky="nw")
+            base_text = tk.Text(parent, height=2, wrap="word",
                                 bg=text_bg, fg=text_fg, insertbackground=text_insert_color,
                                 relief="flat", borderwidth=1, highlightthickness=0)
             base_text.insert("1.0", ", ".join(element.base_classes))
@@ -495,37 +674,67 @@ class FGDApplication(tk.Tk):
             base_text.bind("<FocusOut>", lambda e: self._update_base_classes(element, base_text.get("1.0", "end-1c")))
             row += 1
 
-            helpers_frame = ttk.LabelFrame(self.properties_frame_inner, text="Editor Helpers")
+            helpers_frame = ttk.LabelFrame(parent, text="Editor Helpers")
             helpers_frame.grid(row=row, column=0, columnspan=2, sticky="ew", padx=5, pady=5); row += 1
             self._create_helpers_ui(helpers_frame, element)
 
 
-            def create_section(title, items, ui_creator, add_cmd, r):
-                ttk.Separator(self.properties_frame_inner).grid(row=r, column=0, columnspan=2, sticky="ew", pady=(10,2)); r+=1
-
-                title_frame = ttk.Frame(self.properties_frame_inner)
-                title_frame.grid(row=r, column=0, columnspan=2, sticky="ew", padx=5)
-                ttk.Label(title_frame, text=title, font="-weight bold").pack(side="left")
-                ttk.Button(title_frame, text=f"Add {title.split(':')[0]}", command=add_cmd).pack(side="right")
-                r+=1
+            # Sections are queued row by row (grid rows are reserved up front) so that only
+            # the first batch is built now and the rest follows as the pane is scrolled.
+            pending = self._pending_detail_rows
 
+            def create_section(title, items, ui_creator, add_cmd, r):
+                pending.append(partial(self._create_section_header, parent, title, add_cmd, r)); r+=2
                 for item in items:
-                    frame = ttk.Frame(self.properties_frame_inner)
-                    frame.grid(row=r, column=0, columnspan=2, padx=10, pady=2, sticky="ew")
-                    ui_creator(frame, element, item)
-                    r+=1
+                    pending.append(partial(self._create_section_row, parent, element, item, ui_creator, r)); r+=1
                 return r
 
             row = create_section("Keyvalues:", element.properties, self._create_property_ui, self._add_property_dialog, row)
             row = create_section("Inputs:", element.inputs, lambda f, el, i: self._create_io_ui(f, el, i, "input"), self._add_input_dialog, row)
             row = create_section("Outputs:", element.outputs, lambda f, el, i: self._create_io_ui(f, el, i, "output"), self._add_output_dialog, row)
+            self._render_pending_detail_rows()
 
-        self.properties_frame_inner.grid_columnconfigure(1, weight=1)
+        parent.grid_columnconfigure(1, weight=1)
         if isinstance(element, (MaterialExclusion, AutoVisGroup)):
-             self.properties_frame_inner.grid_rowconfigure(2 if isinstance(element, MaterialExclusion) else 3, weight=1)
+             parent.grid_rowconfigure(2 if isinstance(element, MaterialExclusion) else 3, weight=1)
+
+    def _create_section_header(self, parent, title, add_cmd, row):
+        ttk.Separator(parent).grid(row=row, column=0, columnspan=2, sticky="ew", pady=(10,2))
+
+        title_frame = ttk.Frame(parent)
+        title_frame.grid(row=row + 1, column=0, columnspan=2, sticky="ew", padx=5)
+        ttk.Label(title_frame, text=title, font="-weight bold").pack(side="left")
+        ttk.Button(title_frame, text=f"Add {title.split(':')[0]}", command=add_cmd).pack(side="right")
+
+    def _create_section_row(self, parent, element, item, ui_creator, row):
+        frame = ttk.Frame(parent)
+        frame.grid(row=row, column=0, columnspan=2, padx=10, pady=2, sticky="ew")
+        ui_creator(frame, element, item)
+
+    def _bind_field(self, widget, target, attr, convert=None):
+        """Routes the widget's <FocusOut> to the shared dispatcher, writing target.attr (or target[attr])."""
+        widget._fgd_target = (target, attr, convert)
+        # All fields live in the main window, so the tags after the widget's own path only
+        # depend on its type; reuse them instead of asking Tk for every new widget.
+        class_tags = self._field_bindtags.get(type(widget))
+        if class_tags is None:
+            class_tags = self._field_bindtags[type(widget)] = widget.bindtags()[1:]
+        widget.bindtags((FIELD_BINDTAG, str(widget)) + class_tags)
+
+    def _on_field_focus_out(self, event):
+        widget = event.widget
+        target, attr, convert = widget._fgd_target
+        value = widget.get("1.0", "end-1c") if isinstance(widget, tk.Text) else widget.get()
+        if convert: value = convert(value)
+        if isinstance(target, dict):
+            target[attr] = value
+        else:
+            setattr(target, attr, value)
 
-        self.properties_frame_inner.update_idletasks()
-        self.properties_canvas.configure(scrollregion=self.properties_canvas.bbox("all"))
+    def _enable_text_undo(self, event):
+        """Turns on undo for a bulk-loaded Text widget the first time the user edits it."""
+        event.widget.configure(undo=True, autoseparators=True)
+        event.widget.unbind("<Key>")
 
     def _add_input_dialog(self): self._add_io_dialog("input")
     def _add_output_dialog(self): self._add_io_dialog("output")
@@ -545,13 +754,13 @@ class FGDApplication(tk.Tk):
         if dialog.result:
             new_io = IO(io_type, dialog.result['name'], dialog.result['arg_type'], "")
             self.selected_element.add_io(new_io)
-            self._display_element_details(self.selected_element)
+            self._rebuild_element_details(self.selected_element)
 
     def _remove_io(self, io_obj: IO):
         if not isinstance(self.selected_element, EntityClass): return
         if messagebox.askyesno("Confirm Removal", f"Remove {io_obj.io_type} '{io_obj.name}'?"):
             (self.selected_element.inputs if io_obj.io_type == "input" else self.selected_element.outputs).remove(io_obj)
-            self._display_element_details(self.selected_element)
+            self._rebuild_element_details(self.selected_element)
 
     def _add_property_dialog(self):
         if not isinstance(self.selected_element, EntityClass): return
@@ -573,13 +782,13 @@ class FGDApplication(tk.Tk):
             elif base_type == 'flags': new_prop = FlagsProperty(name, prop_type)
             else: new_prop = KeyvalueProperty(name, prop_type)
             self.selected_element.properties.append(new_prop)
-            self._display_element_details(self.selected_element)
+            self._rebuild_element_details(self.selected_element)
 
     def _remove_property(self, prop: Property):
         if not isinstance(self.selected_element, EntityClass): return
         if messagebox.askyesno("Confirm Removal", f"Remove property '{prop.name}'?"):
             self.selected_element.properties.remove(prop)
-            self._display_element_details(self.selected_element)
+            self._rebuild_element_details(self.selected_element)
 
     def _add_choice(self, prop: ChoicesProperty):
         value = simpledialog.askstring("Add Choice", "Enter Choice Value:")
@@ -587,12 +796,12 @@ class FGDApplication(tk.Tk):
             display = simpledialog.askstring("Add Choice", "Enter Display Name:", initialvalue=value.replace("_", " ").title())
             if display is not None:
                 prop.choices.append(ChoiceItem(value, display, ""))
-                self._display_element_details(self.selected_element)
+                self._rebuild_element_details(self.selected_element)
 
     def _remove_choice(self, prop: ChoicesProperty, choice: ChoiceItem):
         if messagebox.askyesno("Confirm Removal", f"Remove choice '{choice.display_name}'?"):
             prop.choices.remove(choice)
-            self._display_element_details(self.selected_element)
+            self._rebuild_element_details(self.selected_element)
 
     def _add_flag(self, prop: FlagsProperty):
         value_str = simpledialog.askstring("Add Flag", "Enter Flag Value (integer):")
@@ -601,29 +810,27 @@ class FGDApplication(tk.Tk):
             if display is not None:
                 ticked = messagebox.askyesno("Default State", "Should this flag be ticked by default?")
                 prop.flags.append(FlagItem(int(value_str), display, "", ticked))
-                self._display_element_details(self.selected_element)
+                self._rebuild_element_details(self.selected_element)
 
     def _remove_flag(self, prop: FlagsProperty, flag: FlagItem):
         if messagebox.askyesno("Confirm Removal", f"Remove flag '{flag.display_name}'?"):
             prop.flags.remove(flag)
-            self._display_element_details(self.selected_element)
+            self._rebuild_element_details(self.selected_element)
 
     def _create_io_ui(self, parent, element, io_obj, io_type):
         entry_name = ttk.Entry(parent, width=15); entry_name.insert(0, io_obj.name); entry_name.pack(side="left", padx=2)
-        entry_name.bind("<FocusOut>", lambda e, o=io_obj: setattr(o, 'name', e.widget.get()))
+        self._bind_field(entry_name, io_obj, 'name')
         entry_type = ttk.Entry(parent, width=10); entry_type.insert(0, io_obj.arg_type); entry_type.pack(side="left", padx=2)
-        entry_type.bind("<FocusOut>", lambda e, o=io_obj: setattr(o, 'arg_type', e.widget.get()))
+        self._bind_field(entry_type, io_obj, 'arg_type')
         entry_desc = ttk.Entry(parent); entry_desc.insert(0, io_obj.description); entry_desc.pack(side="left", fill="x", expand=True, padx=2)
-        entry_desc.bind("<FocusOut>", lambda e, o=io_obj: setattr(o, 'description', e.widget.get()))
+        self._bind_field(entry_desc, io_obj, 'description')
         ttk.Button(parent, text="X", width=2, command=lambda: self._remove_io(io_obj)).pack(side="right", padx=2)
 
     def _create_property_ui(self, parent, element, prop):
         prop_frame = ttk.LabelFrame(parent, text=f"{prop.name} ({prop.prop_type})")
         prop_frame.pack(fill="x", expand=True, pady=2)
 
-        text_fg = self._get_style_color("TEntry", "foreground", "black")
-        text_bg = self._get_style_color("TEntry", "fieldbackground", "white")
-        text_insert_color = self._get_style_color("TEntry", "insertcolor", text_fg)
+        text_fg, text_bg, text_insert_color = self._text_fg, self._text_bg, self._text_insert_color
 
         top_frame = ttk.Frame(prop_frame)
         top_frame.pack(fill="x", expand=True, padx=5, pady=5)
@@ -631,18 +838,18 @@ class FGDApplication(tk.Tk):
         dn_entry = ttk.Entry(top_frame)
         dn_entry.insert(0, prop.display_name)
         dn_entry.pack(side="left", fill="x", expand=True, padx=5)
-        dn_entry.bind("<FocusOut>", lambda e: setattr(prop, 'display_name', e.widget.get()))
+        self._bind_field(dn_entry, prop, 'display_name')
 
         ttk.Label(top_frame, text="Default:").pack(side="left")
         dv_entry = ttk.Entry(top_frame, width=10)
         dv_entry.insert(0, prop.default_value)
         dv_entry.pack(side="left", padx=5)
-        dv_entry.bind("<FocusOut>", lambda e: setattr(prop, 'default_value', e.widget.get()))
+        self._bind_field(dv_entry, prop, 'default_value')
 
         readonly_var = tk.BooleanVar(value=prop.readonly)
-        ttk.Checkbutton(top_frame, text="Readonly", variable=readonly_var, command=lambda: setattr(prop, 'readonly', readonly_var.get())).pack(side="left", padx=2)
+        ttk.Checkbutton(top_frame, text="Readonly", variable=readonly_var, command=partial(_toggle_attr, prop, 'readonly', readonly_var)).pack(side="left", padx=2)
         report_var = tk.BooleanVar(value=prop.report)
-        ttk.Checkbutton(top_frame, text="Report", variable=report_var, command=lambda: setattr(prop, 'report', report_var.get())).pack(side="left", padx=2)
+        ttk.Checkbutton(top_frame, text="Report", variable=report_var, command=partial(_toggle_attr, prop, 'report', report_var)).pack(side="left", padx=2)
 
         ttk.Button(top_frame, text="Remove", command=lambda: self._remove_property(prop)).pack(side="right")
 
@@ -651,12 +858,27 @@ class FGDApplication(tk.Tk):
                             relief="flat", borderwidth=1, highlightthickness=0)
         desc_text.insert("1.0", prop.description)
         desc_text.pack(fill="x", expand=True, padx=5, pady=(0,5))
-        desc_text.bind("<FocusOut>", lambda e: setattr(prop, 'description', e.widget.get("1.0", "end-1c")))
+        self._bind_field(desc_text, prop, 'description')
 
+        # Choice/flag editors can hold hundreds of entries, so they start collapsed behind
+        # a button unless empty or already expanded by the user for this property.
         if isinstance(prop, ChoicesProperty):
-            self._create_choices_ui(prop_frame, prop)
+            items, noun, ui_creator = prop.choices, "choices", self._create_choices_ui
         elif isinstance(prop, FlagsProperty):
-            self._create_flags_ui(prop_frame, prop)
+            items, noun, ui_creator = prop.flags, "flags", self._create_flags_ui
+        else:
+            return
+        if not items or id(prop) in self._expanded_props:
+            ui_creator(prop_frame, prop)
+        else:
+            expand_btn = ttk.Button(prop_frame, text=f"Show {len(items)} {noun}")
+            expand_btn.configure(command=partial(self._expand_item_block, expand_btn, prop_frame, prop, ui_creator))
+            expand_btn.pack(anchor="w", padx=5, pady=(0,5))
+
+    def _expand_item_block(self, button, parent, prop, ui_creator):
+        self._expanded_props.add(id(prop))
+        button.destroy()
+        ui_creator(parent, prop)
 
     def _create_choices_ui(self, parent, prop: ChoicesProperty):
         choices_frame = ttk.Frame(parent)
@@ -670,14 +892,14 @@ class FGDApplication(tk.Tk):
             f.grid(row=i+1, column=0, columnspan=2, sticky="ew", pady=2)
             ttk.Label(f, text="Val:").pack(side="left")
             v_entry = ttk.Entry(f, width=10); v_entry.insert(0, choice.value); v_entry.pack(side="left", padx=(0,5))
-            v_entry.bind("<FocusOut>", lambda e, c=choice: setattr(c, 'value', e.widget.get()))
+            self._bind_field(v_entry, choice, 'value')
             ttk.Label(f, text="Name:").pack(side="left")
             n_entry = ttk.Entry(f); n_entry.insert(0, choice.display_name); n_entry.pack(side="left", fill="x", expand=True)
-            n_entry.bind("<FocusOut>", lambda e, c=choice: setattr(c, 'display_name', e.widget.get()))
+            self._bind_field(n_entry, choice, 'display_name')
 
             ttk.Label(f, text="Desc:").pack(side="left", padx=(5,0))
             d_entry = ttk.Entry(f); d_entry.insert(0, choice.description); d_entry.pack(side="left", fill="x", expand=True)
-            d_entry.bind("<FocusOut>", lambda e, c=choice: setattr(c, 'description', e.widget.get()))
+            self._bind_field(d_entry, choice, 'description')
 
             ttk.Button(f, text="X", width=2, command=lambda c=choice: self._remove_choice(prop, c)).pack(side="right", padx=2)
 
@@ -693,17 +915,17 @@ class FGDApplication(tk.Tk):
             f.grid(row=i+1, column=0, columnspan=2, sticky="ew", pady=2)
             ttk.Label(f, text="Val:").pack(side="left")
             v_entry = ttk.Entry(f, width=8); v_entry.insert(0, str(flag.value)); v_entry.pack(side="left", padx=(0,5))
-            v_entry.bind("<FocusOut>", lambda e, fl=flag: setattr(fl, 'value', int(e.widget.get() or 0)))
+            self._bind_field(v_entry, flag, 'value', _int_or_zero)
             ttk.Label(f, text="Name:").pack(side="left")
             n_entry = ttk.Entry(f); n_entry.insert(0, flag.display_name); n_entry.pack(side="left", fill="x", expand=True)
-            n_entry.bind("<FocusOut>", lambda e, fl=flag: setattr(fl, 'display_name', e.widget.get()))
+            self._bind_field(n_entry, flag, 'display_name')
 
             ticked_var = tk.BooleanVar(value=flag.default_ticked)
-            ttk.Checkbutton(f, text="On?", variable=ticked_var, command=lambda fl=flag, v=ticked_var: setattr(fl, 'default_ticked', v.get())).pack(side="left", padx=5)
+            ttk.Checkbutton(f, text="On?", variable=ticked_var, command=partial(_toggle_attr, flag, 'default_ticked', ticked_var)).pack(side="left", padx=5)
 
             ttk.Label(f, text="Desc:").pack(side="left", padx=(5,0))
             d_entry = ttk.Entry(f); d_entry.insert(0, flag.description); d_entry.pack(side="left", fill="x", expand=True)
-            d_entry.bind("<FocusOut>", lambda e, fl=flag: setattr(fl, 'description', e.widget.get()))
+            self._bind_field(d_entry, flag, 'description')
 
             ttk.Button(f, text="X", width=2, command=lambda fl=flag: self._remove_flag(prop, fl)).pack(side="right", padx=2)
     
@@ -716,7 +938,7 @@ class FGDApplication(tk.Tk):
             entry = ttk.Entry(parent)
             entry.insert(0, val)
             entry.grid(row=i, column=1, padx=5, pady=2, sticky="ew")
-            entry.bind("<FocusOut>", lambda e, k=key: element.helpers.update({k: e.widget.get()}))
+            self._bind_field(entry, element.helpers, key)
             
             remove_btn = ttk.Button(parent, text="X", width=2, command=lambda k=key: self._remove_helper(element, k))
             remove_btn.grid(row=i, column=2, padx=5, pady=2)
@@ -737,17 +959,17 @@ class FGDApplication(tk.Tk):
             name, args = dialog.result['name'], dialog.result['args']
             if name:
                 element.helpers[name.lower()] = args
-                self._display_element_details(element)
+                self._rebuild_element_details(element)
 
     def _remove_helper(self, element: EntityClass, key: str):
         if key in element.helpers:
             del element.helpers[key]
-            self._display_element_details(element)
+            self._rebuild_element_details(element)
 
     def _update_include_path(self, element: IncludeDirective, new_path: str):
         element.file_path = new_path
         element.update_name()
-        self._update_elements_list()
+        self._refresh_element_row(element)
 
     def _update_mapsize(self, element: MapSize, part: str, widget: ttk.Entry):
         try:
@@ -773,47 +995,51 @@ class FGDApplication(tk.Tk):
             widget.delete(0, tk.END)
             widget.insert(0, str(element.version_number))
 
+    def _text_unchanged(self, element: FGDElement, text_content: str) -> bool:
+        """Returns True if text_content was already applied to element by a previous focus-out."""
+        text_hash = hash(text_content)
+        # The element is stored alongside the hash so a new element reusing a freed id() never matches.
+        committed = self._committed_text_hashes.get(id(element))
+        if committed and committed[0] is element and committed[1] == text_hash:
+            return True
+        self._committed_text_hashes[id(element)] = (element, text_hash)
+        return False
+
     def _update_material_exclusion(self, element: MaterialExclusion, text_content: str):
-        element.excluded_paths = [line.strip() for line in text_content.split('\n') if line.strip()]
+        if self._text_unchanged(element, text_content): return
+        element.excluded_paths = [line for line in map(str.strip, text_content.split('\n')) if line]
         element.update_description()
 
     def _update_autovisgroup_parent(self, element: AutoVisGroup, new_name: str):
         if new_name:
             element.parent_name = new_name
             element.update_name()
-            self._update_elements_list()
+            self._refresh_element_row(element)
 
     def _update_autovisgroup_children(self, element: AutoVisGroup, text_content: str):
-        new_children = []
-        lines = [line.strip() for line in text_content.split('\n') if line.strip()]
-        
-        existing_subgroups = [child for child in element.children if isinstance(child, AutoVisGroup)]
-        
-        for line in lines:
-            if line.startswith('[Sub-group:'): continue 
-            new_children.append(line)
-        
-        element.children = new_children + existing_subgroups
+        if self._text_unchanged(element, text_content): return
+        # Sub-group lines are display-only; the AutoVisGroup children themselves are kept as-is.
+        new_children = [line for line in map(str.strip, text_content.split('\n')) if line and not line.startswith('[Sub-group:')]
+        new_children.extend(child for child in element.children if isinstance(child, AutoVisGroup))
+        element.children = new_children
 
     def _update_element_name(self, element: EntityClass, new_name: str):
         if not new_name or element.name == new_name: return
         old_name = element.name
         if self.fgd_file.class_map.get(new_name):
             messagebox.showerror("Error", f"Class name '{new_name}' already exists.")
-            self._display_element_details(element) 
+            self._rebuild_element_details(element)
             return
 
         self.fgd_file.rename_class(old_name, new_name)
+        self._paste_counters.clear() # A rename can free up previously used suffixes
         element.name = new_name
-        self._update_elements_list()
-        
-        new_id = self.fgd_file.get_id_by_element(element)
-        if new_id: self.elements_list.selection_set(new_id)
+        self._refresh_element_row(element)
 
     def _update_class_type(self, element: EntityClass, new_type: str):
         if element.class_type == new_type: return
         self.fgd_file.change_class_type(element.name, new_type)
-        self._update_elements_list()
+        self._refresh_element_row(element)
 
     def _update_element_description(self, element: EntityClass, new_desc: str):
         element.description = new_desc
@@ -822,7 +1048,11 @@ class FGDApplication(tk.Tk):
         element.base_classes = [b.strip() for b in new_bases_str.split(',') if b.strip()]
 
     def _switch_theme(self, dark_mode: bool):
-        theme.switch_theme(self, dark_mode)
+        if not theme.switch_theme(self, dark_mode):
+            return # Already in that mode; nothing to recolor or rebuild
+        self._refresh_text_colors()
+        # Cached detail frames were built with the previous theme's text colors.
+        self._clear_detail_frame_cache()
         self._display_element_details(self.selected_element)
     
     def _move_element(self, direction: str):
@@ -833,20 +1063,26 @@ class FGDApplication(tk.Tk):
         if not element: return
 
         try:
-            current_index = self.fgd_file.elements.index(element)
+            current_index = self.fgd_file.index_of(element)
             if direction == "up" and current_index > 0:
-                self.fgd_file.elements.insert(current_index - 1, self.fgd_file.elements.pop(current_index))
+                new_index = current_index - 1
             elif direction == "down" and current_index < len(self.fgd_file.elements) - 1:
-                self.fgd_file.elements.insert(current_index + 1, self.fgd_file.elements.pop(current_index))
+                new_index = current_index + 1
             else:
                 return 
-            
-            self._update_elements_list()
-            new_id = self.fgd_file.get_id_by_element(element)
-            if new_id:
-                self.elements_list.selection_set(new_id)
-                self.elements_list.focus(new_id)
-                self.elements_list.see(new_id)
+
+            self.fgd_file.elements.insert(new_index, self.fgd_file.elements.pop(current_index))
+            self.fgd_file.reindex_from(min(current_index, new_index), max(current_index, new_index) + 1)
+
+            # Move the row past the neighbouring element's row rather than to new_index: rows that
+            # failed to display leave tree positions out of step with model indices. A neighbour
+            # without a row of its own needs no tree move at all.
+            neighbour = self.fgd_file.elements[current_index]
+            sibling_id = self.elements_list.prev(selected_id) if direction == "up" else self.elements_list.next(selected_id)
+            if sibling_id and self.fgd_file.element_id_map.get(sibling_id) is neighbour:
+                self.elements_list.move(selected_id, "", self.elements_list.index(sibling_id))
+            self.elements_list.focus(selected_id)
+            self.elements_list.see(selected_id)
 
         except ValueError:
             messagebox.showerror("Error", "Could not find the selected element to move it.")
@@ -868,41 +1104,34 @@ class FGDApplication(tk.Tk):
                 return
             new_element.name = new_name
         
-        original_index = self.fgd_file.elements.index(original_element)
-        self.fgd_file.elements.insert(original_index + 1, new_element)
-        self.fgd_file.add_element(new_element) 
-        self.fgd_file.elements.pop() 
+        original_index = self.fgd_file.index_of(original_element)
+        self.fgd_file.insert_element(original_index + 1, new_element)
 
-        self._update_elements_list()
-        self._select_element_in_tree(new_element.name)
+        self._select_element_in_tree(new_element, self._insert_element_row(new_element, original_index + 1))
 
-    def _handle_cut(self, event=None):
+    def _dispatch_clipboard(self, action: str, virtual_event: str):
         widget = self.focus_get()
-        if isinstance(widget, ttk.Treeview):
-            self._copy_element()
-            self._delete_selected_element()
+        if widget is None: return "break"
+        handler = self._clipboard_actions.get(widget.winfo_class(), {}).get(action)
+        if handler:
+            handler()
         else:
-            try: widget.event_generate("<<Cut>>")
+            try: widget.event_generate(virtual_event)
             except tk.TclError: pass
         return "break"
 
+    def _handle_cut(self, event=None):
+        return self._dispatch_clipboard("cut", "<<Cut>>")
+
     def _handle_copy(self, event=None):
-        widget = self.focus_get()
-        if isinstance(widget, ttk.Treeview):
-            self._copy_element()
-        else:
-            try: widget.event_generate("<<Copy>>")
-            except tk.TclError: pass
-        return "break"
+        return self._dispatch_clipboard("copy", "<<Copy>>")
 
     def _handle_paste(self, event=None):
-        widget = self.focus_get()
-        if isinstance(widget, ttk.Treeview):
-            self._paste_element()
-        else:
-            try: widget.event_generate("<<Paste>>")
-            except tk.TclError: pass
-        return "break"
+        return self._dispatch_clipboard("paste", "<<Paste>>")
+
+    def _cut_element(self):
+        self._copy_element()
+        self._delete_selected_element()
 
     def _copy_element(self):
         if not self.elements_list.selection(): return
@@ -918,10 +1147,11 @@ class FGDApplication(tk.Tk):
 
         if isinstance(new_element, EntityClass):
             original_name = new_element.name
-            counter = 1
+            counter = self._paste_counters.get(original_name, 1)
             while new_element.name in self.fgd_file.class_map:
                 new_element.name = f"{original_name}_paste{counter}"
                 counter += 1
+            self._paste_counters[original_name] = counter
 
         insert_index = len(self.fgd_file.elements)
         if self.elements_list.selection():
@@ -929,15 +1159,10 @@ class FGDApplication(tk.Tk):
             selected_element = self.fgd_file.get_element_by_id(selected_id)
             if selected_element:
                 try:
-                    insert_index = self.fgd_file.elements.index(selected_element) + 1
+                    insert_index = self.fgd_file.index_of(selected_element) + 1
                 except ValueError:
                     pass # Element not in list, append to end
         
-        self.fgd_file.elements.insert(insert_index, new_element)
-        if isinstance(new_element, EntityClass):
-            self.fgd_file.class_map[new_element.name] = new_element
-            if new_element.class_type == "BaseClass":
-                self.fgd_file.base_classes[new_element.name] = new_element
+        self.fgd_file.insert_element(insert_index, new_element)
 
-        self._update_elements_list()
-        self._select_element_in_tree(new_element.name)
\ No newline at end of file
+        self._select_element_in_tree(new_element, self._insert_element_row(new_element, insert_index))
\ No newline at end of file
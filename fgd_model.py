@@ -1,20 +1,39 @@
 # fgd_model.py
 
 import re
+import sys
 import copy
+from functools import lru_cache
+from itertools import chain
+
+@lru_cache(maxsize=256)
+def base_prop_type(prop_type: str) -> str:
+    """
+    Returns the lowercased base of a property type, e.g. "Integer, 1" -> "integer".
+    Shared by the parser and serializer; files only use a handful of distinct types.
+    """
+    return prop_type.split(',', 1)[0].strip().lower()
 
 # --- NEW: Top-Level Directive Models ---
 
 class FGDElement:
     """Base class for any named element in an FGD file."""
+    # Parsing a large FGD creates tens of thousands of model objects, so the whole
+    # hierarchy uses __slots__ instead of a per-instance __dict__.
+    __slots__ = ('name', 'description')
+    class_type = "FGDElement" # Shown in the elements list; EntityClass stores it per instance
+
     def __init__(self, name: str, description: str = ""):
-        if not isinstance(name, str) or not name:
+        if not name:
             raise ValueError("Name must be a non-empty string.")
-        if not isinstance(description, str):
-            raise ValueError("Description must be a string.")
+        # Type and container checks only catch programming errors, so they are skipped under `python -O`.
+        if __debug__:
+            if type(name) is not str:
+                raise ValueError("Name must be a non-empty string.")
+            if type(description) is not str:
+                raise ValueError("Description must be a string.")
         self.name = name
         self.description = description
-        self.class_type = self.__class__.__name__
 
     def duplicate(self):
         """Creates a deep copy of this element."""
@@ -25,10 +44,12 @@ class FGDElement:
 
 class IncludeDirective(FGDElement):
     """Represents an @include directive in an FGD file."""
+    __slots__ = ('file_path',)
+    class_type = "Include"
+
     def __init__(self, file_path: str):
         super().__init__(name=f"@include \"{file_path}\"", description=f"Includes definitions from '{file_path}'")
         self.file_path = file_path
-        self.class_type = "Include"
 
     def update_name(self):
         """Updates the name based on the file path."""
@@ -39,6 +60,9 @@ class IncludeDirective(FGDElement):
 
 class MapSize(FGDElement):
     """Represents a @mapsize directive."""
+    __slots__ = ('min_coord', 'max_coord')
+    class_type = "MapSize"
+
     def __init__(self, min_coord: int, max_coord: int):
         super().__init__(name="@mapsize", description=f"Defines map bounds from {min_coord} to {max_coord}")
         self.min_coord = min_coord
@@ -50,6 +74,9 @@ class MapSize(FGDElement):
 
 class Version(FGDElement):
     """Represents a @version directive."""
+    __slots__ = ('version_number',)
+    class_type = "Version"
+
     def __init__(self, version_number: int):
         super().__init__(name="@version", description=f"Specifies FGD version {version_number}")
         self.version_number = version_number
@@ -60,6 +87,9 @@ class Version(FGDElement):
 
 class MaterialExclusion(FGDElement):
     """Represents a @MaterialExclusion block."""
+    __slots__ = ('excluded_paths',)
+    class_type = "MaterialExclusion"
+
     def __init__(self, excluded_paths: list[str]):
         super().__init__(name="@MaterialExclusion", description=f"Excludes {len(excluded_paths)} material paths")
         self.excluded_paths = excluded_paths
@@ -70,6 +100,9 @@ class MaterialExclusion(FGDElement):
 
 class AutoVisGroup(FGDElement):
     """Represents an @AutoVisGroup block."""
+    __slots__ = ('parent_name', 'children')
+    class_type = "AutoVisGroup"
+
     def __init__(self, parent_name: str, children: list):
         super().__init__(name=f"VisGroup: {parent_name}", description="Editor automatic visibility group")
         self.parent_name = parent_name
@@ -83,67 +116,112 @@ class AutoVisGroup(FGDElement):
 
 class Property(FGDElement):
     """Base class for all types of properties (keyvalues, flags, etc.)."""
+    __slots__ = ('prop_type', 'display_name', 'default_value', 'readonly', 'report')
+    class_type = "Property"
+
     def __init__(self, name: str, prop_type: str, display_name: str = "", default_value: str = "", description: str = "", readonly: bool = False, report: bool = False):
         super().__init__(name, description)
-        self.prop_type = prop_type
+        # Type names repeat across thousands of objects; interning shares one string per type.
+        self.prop_type = sys.intern(prop_type)
         self.display_name = display_name if isinstance(display_name, str) else ""
         self.default_value = default_value if isinstance(default_value, str) else ""
         self.readonly = readonly
         self.report = report
 
+    def duplicate(self):
+        """Creates a copy of this property; its fields are all immutable."""
+        return copy.copy(self)
+
     def __repr__(self):
         return f"Property(name='{self.name}', type='{self.prop_type}', default='{self.default_value}')"
 
 class KeyvalueProperty(Property):
+    __slots__ = ()
+    class_type = "KeyvalueProperty"
+
     def __init__(self, name: str, prop_type: str, display_name: str = "", default_value: str = "", description: str = "", readonly: bool = False, report: bool = False):
         super().__init__(name, prop_type, display_name, default_value, description, readonly, report)
 
 class ChoiceItem(FGDElement):
     """Represents a single choice option within a ChoicesProperty."""
+    __slots__ = ('value', 'display_name')
+    class_type = "ChoiceItem"
+
     def __init__(self, value: str, display_name: str = "", description: str = ""):
         super().__init__(name=value, description=description)
         self.value = value
         self.display_name = display_name
 
+    def duplicate(self):
+        return copy.copy(self)
+
     def __repr__(self):
         return f"ChoiceItem(value='{self.value}', display_name='{self.display_name}')"
 
 class ChoicesProperty(Property):
+    __slots__ = ('choices',)
+    class_type = "ChoicesProperty"
+
     def __init__(self, name: str, prop_type: str, display_name: str = "", default_value: str = "", description: str = "", choices: list = None, readonly: bool = False, report: bool = False):
         super().__init__(name, prop_type, display_name, default_value, description, readonly, report)
         self.choices = choices if choices is not None else []
-        if not all(isinstance(choice, ChoiceItem) for choice in self.choices):
+        if __debug__ and not all(isinstance(choice, ChoiceItem) for choice in self.choices):
             raise ValueError("Choices must be a list of ChoiceItem objects.")
 
+    def duplicate(self):
+        clone = copy.copy(self)
+        clone.choices = [choice.duplicate() for choice in self.choices]
+        return clone
+
     def __repr__(self):
         return f"ChoicesProperty(name='{self.name}', choices={len(self.choices)} items)"
 
 class FlagItem(FGDElement):
     """Represents a single flag option within a FlagsProperty."""
+    __slots__ = ('value', 'display_name', 'default_ticked')
+    class_type = "FlagItem"
+
     def __init__(self, value: int, display_name: str = "", description: str = "", default_ticked: bool = False):
         super().__init__(name=str(value), description=description)
         self.value = value
         self.display_name = display_name
         self.default_ticked = default_ticked
 
+    def duplicate(self):
+        return copy.copy(self)
+
     def __repr__(self):
         return f"FlagItem(value={self.value}, display_name='{self.display_name}', default_ticked={self.default_ticked})"
 
 class FlagsProperty(Property):
+    __slots__ = ('flags',)
+    class_type = "FlagsProperty"
+
     def __init__(self, name: str, prop_type: str, display_name: str = "", default_value: str = "", description: str = "", flags: list = None, readonly: bool = False, report: bool = False):
         super().__init__(name, prop_type, display_name, default_value, description, readonly, report)
         self.flags = flags if flags is not None else []
-        if not all(isinstance(flag, FlagItem) for flag in self.flags):
+        if __debug__ and not all(isinstance(flag, FlagItem) for flag in self.flags):
             raise ValueError("Flags must be a list of FlagItem objects.")
 
+    def duplicate(self):
+        clone = copy.copy(self)
+        clone.flags = [flag.duplicate() for flag in self.flags]
+        return clone
+
     def __repr__(self):
         return f"FlagsProperty(name='{self.name}', flags={len(self.flags)} items)"
 
 class IO(FGDElement):
+    __slots__ = ('io_type', 'arg_type')
+    class_type = "IO"
+
     def __init__(self, io_type: str, name: str, arg_type: str = "", description: str = ""):
         super().__init__(name, description)
-        self.io_type = io_type # 'input' or 'output'
-        self.arg_type = arg_type
+        self.io_type = sys.intern(io_type) # 'input' or 'output'
+        self.arg_type = sys.intern(arg_type)
+
+    def duplicate(self):
+        return copy.copy(self)
 
     def __repr__(self):
         return f"IO(type='{self.io_type}', name='{self.name}', arg_type='{self.arg_type}')"
@@ -152,21 +230,24 @@ class IO(FGDElement):
 
 class EntityClass(FGDElement):
     """Represents a @SolidClass, @PointClass, @BaseClass, etc."""
+    __slots__ = ('class_type', 'base_classes', 'properties', 'inputs', 'outputs', 'helpers')
+
     def __init__(self, class_type: str, name: str, description: str = "", base_classes: list = None,
                  properties: list = None, inputs: list = None, outputs: list = None,
                  helpers: dict = None):
         super().__init__(name, description)
-        self.class_type = class_type
+        self.class_type = sys.intern(class_type)
         self.base_classes = list(base_classes) if base_classes is not None else []
         self.properties = properties if properties is not None else []
         self.inputs = inputs if inputs is not None else []
         self.outputs = outputs if outputs is not None else []
         self.helpers = helpers if helpers is not None else {}
 
-        if not all(isinstance(prop, Property) for prop in self.properties):
-            raise ValueError("Properties must be a list of Property objects.")
-        if not all(isinstance(io, IO) for io in self.inputs + self.outputs):
-            raise ValueError("Inputs/Outputs must be a list of IO objects.")
+        if __debug__:
+            if not all(isinstance(prop, Property) for prop in self.properties):
+                raise ValueError("Properties must be a list of Property objects.")
+            if not all(isinstance(io, IO) for io in chain(self.inputs, self.outputs)):
+                raise ValueError("Inputs/Outputs must be a list of IO objects.")
 
     def add_io(self, io_obj: IO):
         """Adds an IO object to the correct list (inputs or outputs)."""
@@ -175,6 +256,16 @@ class EntityClass(FGDElement):
         elif io_obj.io_type == 'output':
             self.outputs.append(io_obj)
 
+    def duplicate(self):
+        """Creates a deep copy of this class without going through copy.deepcopy's generic traversal."""
+        clone = copy.copy(self)
+        clone.base_classes = list(self.base_classes)
+        clone.properties = [prop.duplicate() for prop in self.properties]
+        clone.inputs = [io.duplicate() for io in self.inputs]
+        clone.outputs = [io.duplicate() for io in self.outputs]
+        clone.helpers = dict(self.helpers) # Helper arguments are plain strings
+        return clone
+
     def __repr__(self):
         return (f"EntityClass(type='{self.class_type}', name='{self.name}', "
                 f"props={len(self.properties)}, inputs={len(self.inputs)}, outputs={len(self.outputs)})")
@@ -186,10 +277,30 @@ class FGDFile:
         self.class_map = {}
         self.base_classes = {}
         self.element_id_map = {} # Maps Treeview IID to element object
+        self._index_map = {} # Maps id(element) to its position in self.elements
 
     def add_element(self, element: FGDElement):
         """Adds an FGD element to the file and updates internal maps."""
+        self._index_map[id(element)] = len(self.elements)
         self.elements.append(element)
+        self.register_element(element)
+
+    def add_elements(self, elements: list[FGDElement]):
+        """Appends many elements at once, e.g. everything a parser read from a file."""
+        start = len(self.elements)
+        self.elements.extend(elements)
+        self._index_map.update((id(element), i) for i, element in enumerate(elements, start))
+        for element in elements:
+            self.register_element(element)
+
+    def insert_element(self, index: int, element: FGDElement):
+        """Inserts an FGD element at the given position and updates internal maps."""
+        self.elements.insert(index, element)
+        self.reindex_from(index)
+        self.register_element(element)
+
+    def register_element(self, element: FGDElement):
+        """Adds an element to the class maps without touching self.elements."""
         if isinstance(element, EntityClass):
             self.class_map[element.name] = element
             if element.class_type == "BaseClass":
@@ -197,8 +308,11 @@ class FGDFile:
 
     def remove_element(self, element: FGDElement):
         """Removes an element and updates internal maps."""
-        if element in self.elements:
-            self.elements.remove(element)
+        index = self._index_map.get(id(element))
+        if index is not None and index < len(self.elements) and self.elements[index] is element:
+            del self._index_map[id(element)]
+            del self.elements[index]
+            self.reindex_from(index)
         if isinstance(element, EntityClass):
             if element.name in self.class_map:
                 del self.class_map[element.name]
@@ -227,11 +341,25 @@ class FGDFile:
         if element.class_type == "BaseClass" and name in self.base_classes:
             del self.base_classes[name]
         
-        element.class_type = new_type
+        element.class_type = sys.intern(new_type)
         
         if new_type == "BaseClass":
             self.base_classes[name] = element
 
+    def index_of(self, element: FGDElement) -> int:
+        """Returns the element's position in self.elements, raising ValueError if absent."""
+        index = self._index_map.get(id(element))
+        if index is None or index >= len(self.elements) or self.elements[index] is not element:
+            raise ValueError(f"{element!r} is not in this FGD file.")
+        return index
+
+    def reindex_from(self, start: int, stop: int | None = None):
+        """Refreshes index_of() positions after self.elements was mutated from start (up to stop)."""
+        elements = self.elements
+        stop = len(elements) if stop is None else min(stop, len(elements))
+        for i in range(start, stop):
+            self._index_map[id(elements[i])] = i
+
     def get_element_by_id(self, iid: str) -> FGDElement | None:
         return self.element_id_map.get(iid)
     
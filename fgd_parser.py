@@ -1,136 +1,294 @@
 # fgd_parser.py
 
 import re
+import sys
+from functools import lru_cache
 from fgd_model import (
     FGDFile, EntityClass, KeyvalueProperty, ChoicesProperty, FlagsProperty,
     IO, ChoiceItem, FlagItem, IncludeDirective, Property, MapSize, Version,
-    MaterialExclusion, AutoVisGroup
+    MaterialExclusion, AutoVisGroup, base_prop_type
 )
 
+# Patterns are compiled once at import instead of going through re's cache on every line.
+_CONTINUATION_RE = re.compile(r'"\s*\+\s*\n\s*"')
+_DIRECTIVE_WORD_RE = re.compile(r'@\w+')
+# Matched after the '@autovisgroup' keyword, which directive dispatch has already matched case-insensitively.
+_AUTOVIS_TAIL_RE = re.compile(r'\s*=\s*"([^"]+)"')
+_QUOTED_RE = re.compile(r'"([^"]+)"')
+# Under DOTALL '.' already matches newlines; the old '(?:.|\n)*' backtracked exponentially
+# on multi-line descriptions that failed to match.
+_NAME_DESC_RE = re.compile(r'^\s*([a-zA-Z0-9_]+)\s*(?::\s*"(.*)")?\s*$', re.DOTALL)
+_CLASS_TYPE_RE = re.compile(r'@(\w+)\s*(.*)', re.DOTALL)
+_HELPER_RE = re.compile(r'\b([a-zA-Z0-9_]+)\s*\(')
+# Only the structural characters matter when balancing headers, so skip everything else in C.
+_HEADER_STRUCT_RE = re.compile(r'[(){}=]')
+_BRACKET_RE = re.compile(r'[(){}]')
+
+# Raw directive word (e.g. "PointClass", "pointclass") -> normalized, interned class type.
+_CLASS_TYPE_NAMES: dict[str, str] = {}
+# Descriptions below are '[^"]*': the former '(?:[^"]|\\")*' always took the '[^"]' branch
+# for a backslash, so it stopped at the same quote but with overlapping alternatives.
+# The input/output keyword is checked on a lowercased prefix; this matches the rest of the line.
+_IO_TAIL_RE = re.compile(r'\s+([^\s(]+)\s*\(([^)]*)\)\s*(?::\s*"([^"]*)")?')
+_PROP_RE = re.compile(r'^\s*([\w."]+)\s*\(([^)]+)\)\s*((?i:readonly))?\s*((?i:report))?\s*(.*)')
+_CHOICE_RE = re.compile(r'^\s*("?[^"]+"?)\s*:\s*"([^"]+)"(?:\s*:\s*"([^"]*)")?')
+_FLAG_RE = re.compile(r'^\s*(-?\d+)\s*:\s*"([^"]+)"(?:\s*:\s*(\d))?(?:\s*:\s*"([^"]*)")?')
+
+def _directive_args(line: str, keyword_len: int) -> str | None:
+    """
+    Returns the text between the parentheses of a '@keyword(...)' line, or None if
+    they are missing or anything other than whitespace precedes the '('.
+    """
+    open_idx = line.find('(', keyword_len)
+    close_idx = line.find(')', open_idx + 1)
+    if open_idx == -1 or close_idx == -1 or line[keyword_len:open_idx].strip():
+        return None
+    return line[open_idx + 1:close_idx]
+
+def _iter_prop_tokens(s: str):
+    """
+    Yields the whitespace-separated tokens of a property tail, keeping a double-quoted
+    run (with backslash escapes) together as one token. An unterminated quote falls
+    back to an ordinary token, matching the regex this replaces.
+    """
+    i, n = 0, len(s)
+    while i < n:
+        if s[i].isspace():
+            i += 1
+            continue
+        if s[i] == '"':
+            end = s.find('"', i + 1)
+            while end != -1:
+                # The quote closes the token unless an odd run of backslashes escapes it.
+                k = end
+                while k > i + 1 and s[k - 1] == '\\':
+                    k -= 1
+                if (end - k) % 2 == 0:
+                    break
+                end = s.find('"', end + 1)
+            if end != -1:
+                yield s[i:end + 1]
+                i = end + 1
+                continue
+        j = i + 1
+        while j < n and not s[j].isspace():
+            j += 1
+        yield s[i:j]
+        i = j
+
+@lru_cache(maxsize=512)
+def _parse_helper_text(helper_str: str) -> tuple[tuple, tuple]:
+    """
+    Parses helper functions, now with support for nested curly braces. Many classes
+    repeat the same helper string (e.g. a shared base(...) list), so results are
+    cached and returned as tuples that callers copy.
+    """
+    helpers, base_classes = {}, []
+    cursor = 0
+    while cursor < len(helper_str):
+        match = _HELPER_RE.search(helper_str[cursor:])
+        if not match: break
+
+        key = match.group(1).lower()
+        start_paren = cursor + match.end()
+
+        paren_level = 1
+        brace_level = 0
+        end_pos = len(helper_str)
+
+        for bracket in _BRACKET_RE.finditer(helper_str, start_paren):
+            char = bracket.group()
+            if char == '(': paren_level += 1
+            elif char == ')': paren_level -= 1
+            elif char == '{': brace_level += 1
+            elif char == '}': brace_level -= 1
+
+            if paren_level == 0 and brace_level == 0:
+                end_pos = bracket.start()
+                break
+
+        if paren_level == 0 and brace_level == 0:
+            args = helper_str[start_paren:end_pos].strip()
+            if key == 'base':
+                base_classes.extend(filter(None, map(str.strip, args.split(','))))
+            else:
+                helpers[key] = args
+            cursor = end_pos + 1
+        else:
+            cursor += 1 
+    return tuple(helpers.items()), tuple(base_classes)
+
 class FGDParser:
     def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Clears all per-file parsing state so the parser can be reused for another file.
+        """
         self.fgd_file = FGDFile()
+        self._parsed_elements = [] # Collected in file order and added to fgd_file in one go
+        self._release_lines()
+
+    def _release_lines(self):
+        """
+        Drops the source text of the last parse. The GUI keeps one parser alive for the
+        whole session, so without this a large FGD stays in memory twice after loading.
+        """
         self.lines = []
+        self._stripped_lines = []
+        self._next_meaningful_idx = [0]
         self.current_line_idx = 0
 
     def parse_fgd_file(self, filepath: str) -> FGDFile:
         """
         Parses a .fgd file from the given path into an FGDFile object.
         """
-        self.fgd_file = FGDFile()
-        self.lines = []
-        self.current_line_idx = 0
+        self.reset()
 
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 content = f.read()
-                # Pre-process content to handle descriptions split by '+'
-                content = re.sub(r'"\s*\+\s*\n\s*"', '', content)
+                # Pre-process content to handle descriptions split by '+'. Most files have no
+                # continuations, and a C-level substring check is far cheaper than the regex scan.
+                if '+' in content:
+                    content = _CONTINUATION_RE.sub('', content)
                 
                 # FIX 1 (Retained): Handle stacked closing brackets.
                 content = content.replace(']]', ']\n]')
                 
                 self.lines = content.splitlines()
+                del content # Don't hold the whole file text alongside the split lines while parsing
         except Exception as e:
             raise IOError(f"Could not read file at {filepath}: {e}")
+        self._index_meaningful_lines()
 
         while self.current_line_idx < len(self.lines):
             line = self._get_next_meaningful_line()
             if not line:
                 break
 
-            if line.lower().startswith('@'):
+            if line.startswith('@'):
                 self._parse_directive(line)
             else:
                 print(f"Warning: Unrecognized top-level line (skipped): {line}")
         
+        self.fgd_file.add_elements(self._parsed_elements)
+        self._parsed_elements = []
+        self._release_lines()
         return self.fgd_file
 
+    def _index_meaningful_lines(self):
+        """
+        Strips every line once and records, for each line index, where the next
+        non-comment, non-empty line is, so peeking and advancing are plain lookups.
+        self.lines keeps the raw text for the multi-line entity header scan.
+        """
+        stripped = [line.strip() for line in self.lines]
+        count = len(stripped)
+        next_idx = [count] * (count + 1)
+        upcoming = count
+        for i in range(count - 1, -1, -1):
+            line = stripped[i]
+            if line and not line.startswith('//'):
+                upcoming = i
+            next_idx[i] = upcoming
+        self._stripped_lines = stripped
+        self._next_meaningful_idx = next_idx
+
     def _peek_next_meaningful_line(self):
         """
         Looks at the next non-comment, non-empty line without advancing the parser.
         """
-        idx = self.current_line_idx
-        while idx < len(self.lines):
-            line = self.lines[idx].strip()
-            if line and not line.startswith('//'):
-                return line
-            idx += 1
-        return None
+        idx = self._next_meaningful_idx[self.current_line_idx]
+        return self._stripped_lines[idx] if idx < len(self._stripped_lines) else None
 
     def _get_next_meaningful_line(self):
         """
         Gets the next non-comment, non-empty line and advances the parser.
         """
-        while self.current_line_idx < len(self.lines):
-            line = self.lines[self.current_line_idx].strip()
-            self.current_line_idx += 1
-            if line and not line.startswith('//'):
-                return line
-        return None
+        idx = self._next_meaningful_idx[self.current_line_idx]
+        if idx >= len(self._stripped_lines):
+            self.current_line_idx = idx
+            return None
+        self.current_line_idx = idx + 1
+        return self._stripped_lines[idx]
+
+    def _next_line_in_block(self):
+        """
+        Returns the next meaningful line and advances past it, or None without advancing
+        when the block's closing ']' (or the end of the file) is next. Block loops call
+        this once per line instead of a peek followed by a get.
+        """
+        idx = self._next_meaningful_idx[self.current_line_idx]
+        if idx >= len(self._stripped_lines):
+            return None
+        line = self._stripped_lines[idx]
+        if line == ']':
+            return None
+        self.current_line_idx = idx + 1
+        return line
 
     def _parse_directive(self, line: str):
         """
         Routes a directive line (starting with '@') to the correct parsing function.
         """
-        line_lower = line.lower()
-        if line_lower.startswith('@include'):
-            self._parse_include(line)
-        elif line_lower.startswith('@mapsize'):
-            self._parse_mapsize(line)
-        elif line_lower.startswith('@version'):
-            self._parse_version(line)
-        elif line_lower.startswith('@materialexclusion'):
-            self._parse_material_exclusion()
-        elif line_lower.startswith('@autovisgroup'):
-            self._parse_autovisgroup(line)
-        elif line_lower.startswith(('@pointclass', '@solidclass', '@baseclass', '@npcclass', '@keyframeclass', '@moveclass', '@filterclass', '@extendclass')):
-            self._parse_entity_class(line)
+        word = _DIRECTIVE_WORD_RE.match(line)
+        handler = _DIRECTIVE_HANDLERS.get(word.group().lower()) if word else None
+        if handler:
+            handler(self, line)
         else:
             print(f"Warning: Unknown directive: {line}")
 
     def _parse_include(self, line: str):
-        match = re.match(r'@include\s+"([^"]+)"', line, re.IGNORECASE)
-        if match:
-            self.fgd_file.add_element(IncludeDirective(match.group(1)))
+        # @include "path" -- the keyword must be followed by whitespace, then a non-empty quoted path.
+        head, _, rest = line.partition('"')
+        path, closed, _ = rest.partition('"')
+        if closed and path and head[len('@include'):].isspace():
+            self._parsed_elements.append(IncludeDirective(path))
 
     def _parse_mapsize(self, line: str):
-        match = re.search(r'@mapsize\s*\(\s*(-?\d+)\s*,\s*(-?\d+)\s*\)', line, re.IGNORECASE)
-        if match:
-            self.fgd_file.add_element(MapSize(int(match.group(1)), int(match.group(2))))
+        args = _directive_args(line, len('@mapsize'))
+        if args is None: return
+        min_str, _, max_str = args.partition(',')
+        try:
+            self._parsed_elements.append(MapSize(int(min_str), int(max_str)))
+        except ValueError:
+            pass # Malformed bounds; skipped like any other unmatched directive
 
     def _parse_version(self, line: str):
-        match = re.search(r'@version\s*\((\d+)\)', line, re.IGNORECASE)
-        if match:
-            self.fgd_file.add_element(Version(int(match.group(1))))
+        args = _directive_args(line, len('@version'))
+        if args is None: return
+        try:
+            self._parsed_elements.append(Version(int(args)))
+        except ValueError:
+            pass
 
-    def _parse_material_exclusion(self):
+    def _parse_material_exclusion(self, line: str):
         paths = []
         if self._peek_next_meaningful_line() == '[':
             self._get_next_meaningful_line() # Consume '['
             while True:
                 line = self._get_next_meaningful_line()
                 if not line or line == ']': break
-                match = re.search(r'"([^"]+)"', line)
+                match = _QUOTED_RE.search(line)
                 if match: paths.append(match.group(1))
-            self.fgd_file.add_element(MaterialExclusion(paths))
+            self._parsed_elements.append(MaterialExclusion(paths))
 
     def _parse_autovisgroup(self, line: str):
-        match = re.search(r'@autovisgroup\s*=\s*"([^"]+)"', line, re.IGNORECASE)
+        match = _AUTOVIS_TAIL_RE.match(line, len('@autovisgroup'))
         if match:
             parent_name = match.group(1)
             children = self._parse_autovisgroup_block()
-            self.fgd_file.add_element(AutoVisGroup(parent_name, children))
+            self._parsed_elements.append(AutoVisGroup(parent_name, children))
 
     def _parse_autovisgroup_block(self):
         content = []
         if self._peek_next_meaningful_line() != '[': return content
         self._get_next_meaningful_line() # Consume '['
         
-        while self._peek_next_meaningful_line() != ']':
-            line = self._get_next_meaningful_line()
-            if not line: break
-            child_name_match = re.search(r'"([^"]+)"', line)
+        while (line := self._next_line_in_block()) is not None:
+            child_name_match = _QUOTED_RE.search(line)
             if not child_name_match: continue
             child_name = child_name_match.group(1)
             
@@ -151,7 +309,7 @@ class FGDParser:
         if not body_started:
             while self.current_line_idx < len(self.lines):
                 next_line = self.lines[self.current_line_idx]
-                if next_line.strip().startswith('['): break
+                if self._stripped_lines[self.current_line_idx].startswith('['): break
                 header_lines.append(next_line)
                 self.current_line_idx += 1
                 if '[' in next_line:
@@ -170,13 +328,14 @@ class FGDParser:
         paren_level = 0
         brace_level = 0
         equals_index = -1
-        for i, char in enumerate(header_text):
+        for struct in _HEADER_STRUCT_RE.finditer(header_text):
+            char = struct.group()
             if char == '(': paren_level += 1
             elif char == ')': paren_level -= 1
             elif char == '{': brace_level += 1
             elif char == '}': brace_level -= 1
-            elif char == '=' and paren_level == 0 and brace_level == 0:
-                equals_index = i
+            elif paren_level == 0 and brace_level == 0:
+                equals_index = struct.start()
                 break
 
         if equals_index == -1:
@@ -186,29 +345,31 @@ class FGDParser:
         before_equals = header_text[:equals_index]
         after_equals = header_text[equals_index + 1:]
 
-        name_and_desc_match = re.search(r'^\s*([a-zA-Z0-9_]+)\s*(?::\s*"((?:.|\n)*)")?\s*$', after_equals.strip(), re.DOTALL)
+        name_and_desc_match = _NAME_DESC_RE.search(after_equals.strip())
         if not name_and_desc_match:
             print(f"Error: Malformed entity directive (no name found after '='): {first_line}")
             return
         name, description = name_and_desc_match.groups()
         description = description.strip().replace('\\"', '"') if description else ""
         
-        class_match = re.match(r'@(\w+)\s*(.*)', before_equals.strip(), re.DOTALL | re.IGNORECASE)
+        class_match = _CLASS_TYPE_RE.match(before_equals.strip())
         if not class_match:
             print(f"Error: Malformed entity directive (no class type found): {first_line}")
             return
             
         class_type_raw, helpers_str = class_match.groups()
         
-        base_name = class_type_raw
-        if base_name.lower().endswith('class'):
-            base_name = base_name[:-5]
-        class_type = base_name.capitalize() + "Class"
+        class_type = _CLASS_TYPE_NAMES.get(class_type_raw)
+        if class_type is None:
+            base_name = class_type_raw
+            if base_name.lower().endswith('class'):
+                base_name = base_name[:-5]
+            class_type = _CLASS_TYPE_NAMES[class_type_raw] = sys.intern(base_name.capitalize() + "Class")
 
         helpers, base_classes = self._parse_helpers_and_bases(helpers_str)
 
         new_entity = EntityClass(name=name, class_type=class_type, description=description, base_classes=base_classes, helpers=helpers)
-        self.fgd_file.add_element(new_entity)
+        self._parsed_elements.append(new_entity)
 
         if body_remainder and body_remainder.strip() == ']':
             return
@@ -223,41 +384,10 @@ class FGDParser:
 
     def _parse_helpers_and_bases(self, helper_str: str):
         """
-        Parses helper functions, now with support for nested curly braces.
+        Returns fresh (helpers, base_classes) containers for an entity header.
         """
-        helpers, base_classes = {}, []
-        cursor = 0
-        while cursor < len(helper_str):
-            match = re.search(r'\b([a-zA-Z0-9_]+)\s*\(', helper_str[cursor:])
-            if not match: break
-            
-            key = match.group(1).lower()
-            start_paren = cursor + match.end()
-            
-            paren_level = 1
-            brace_level = 0
-            end_pos = start_paren
-            
-            while end_pos < len(helper_str):
-                char = helper_str[end_pos]
-                if char == '(': paren_level += 1
-                elif char == ')': paren_level -= 1
-                elif char == '{': brace_level += 1
-                elif char == '}': brace_level -= 1
-                
-                if paren_level == 0 and brace_level == 0: break
-                end_pos += 1
-            
-            if paren_level == 0 and brace_level == 0:
-                args = helper_str[start_paren:end_pos].strip()
-                if key == 'base':
-                    base_classes.extend([b.strip() for b in args.split(',') if b.strip()])
-                else:
-                    helpers[key] = args
-                cursor = end_pos + 1
-            else:
-                cursor += 1 
-        return helpers, base_classes
+        helper_items, base_classes = _parse_helper_text(helper_str)
+        return dict(helper_items), list(base_classes)
 
     def _parse_entity_content(self, entity: EntityClass, remainder: str | None):
         """
@@ -276,10 +406,11 @@ class FGDParser:
         if self._peek_next_meaningful_line() == '[':
             self._get_next_meaningful_line()
 
-        while self._peek_next_meaningful_line() not in (']', None):
-            line = self._get_next_meaningful_line()
-            if line:
-                self._parse_entity_line(entity, line)
+        parse_line = self._parse_entity_line
+        while True:
+            line = self._next_line_in_block()
+            if line is None: break
+            parse_line(entity, line)
         
         if self._peek_next_meaningful_line() == ']':
             self._get_next_meaningful_line()
@@ -291,27 +422,33 @@ class FGDParser:
         line = line.strip()
         if not line: return
 
-        io_match = re.match(r'^\s*(input|output)\s+([^\s(]+)\s*\(([^)]*)\)\s*(?::\s*"((?:[^"]|\\")*)")?', line, re.IGNORECASE)
+        # Most lines are properties, so only run the IO pattern on lines that can be one.
+        prefix = line[:6].lower()
+        io_type = 'input' if prefix.startswith('input') else 'output' if prefix == 'output' else None
+        io_match = _IO_TAIL_RE.match(line, len(io_type)) if io_type else None
         if io_match:
-            io_type, io_name, arg_type, io_desc = io_match.groups()
-            entity.add_io(IO(io_type.lower(), io_name, arg_type, io_desc.replace('\\"', '"') if io_desc else ""))
+            io_name, arg_type, io_desc = io_match.groups()
+            # Most descriptions have no escapes; the membership test is cheaper than a no-op replace.
+            if io_desc and '\\' in io_desc: io_desc = io_desc.replace('\\"', '"')
+            (entity.inputs if io_type == 'input' else entity.outputs).append(
+                IO(io_type, io_name, arg_type, io_desc or ""))
             return
 
-        prop_match = re.match(r'^\s*([\w."]+)\s*\(([^)]+)\)\s*(readonly)?\s*(report)?\s*(.*)', line, re.IGNORECASE)
+        prop_match = _PROP_RE.match(line) if '(' in line else None
         if prop_match:
             prop_name, prop_type_raw, readonly, report, rest_of_line = prop_match.groups()
             is_block = rest_of_line.strip().endswith('=') or self._peek_next_meaningful_line() == '['
             
             display_name, default_value, description = self._extract_prop_details(rest_of_line)
-            prop_type_base = prop_type_raw.split(',')[0].strip().lower()
+            prop_type_base = base_prop_type(prop_type_raw)
             prop = None
             
             if prop_type_base == 'choices':
                 prop = ChoicesProperty(prop_name, prop_type_raw, display_name, default_value, description, readonly=bool(readonly), report=bool(report))
-                if is_block: self._parse_choices_or_flags_block(prop, self._parse_choice_item)
+                if is_block: self._parse_choices_or_flags_block(prop, self._parse_choice_items)
             elif prop_type_base == 'flags':
                 prop = FlagsProperty(prop_name, prop_type_raw, display_name, default_value, description, readonly=bool(readonly), report=bool(report))
-                if is_block: self._parse_choices_or_flags_block(prop, self._parse_flag_item)
+                if is_block: self._parse_choices_or_flags_block(prop, self._parse_flag_items)
             else:
                 prop = KeyvalueProperty(prop_name, prop_type_raw, display_name, default_value, description, readonly=bool(readonly), report=bool(report))
             
@@ -327,51 +464,65 @@ class FGDParser:
         s = s.strip()
         if s.endswith('='): s = s[:-1].strip()
         
-        parts = re.findall(r'"(?:\\.|[^"\\])*"|\S+', s)
-        
         cleaned_parts = []
-        for part in parts:
-            part = part.strip()
+        for part in _iter_prop_tokens(s):
             if part == ':': continue
             if (part.startswith('"') and part.endswith('"')) or \
                (part.startswith("'") and part.endswith("'")):
                 cleaned_parts.append(part[1:-1].replace('\\"', '"'))
             else:
                 cleaned_parts.append(part)
+            if len(cleaned_parts) == 3: break # Anything past the description is ignored
 
         return (cleaned_parts + ["", "", ""])[:3]
 
-    def _parse_choices_or_flags_block(self, prop, item_parser_func):
+    def _parse_choices_or_flags_block(self, prop, items_parser_func):
         """
         Generic, safer parser for a block of items (like choices or flags) enclosed in [...].
+        The block's lines are collected first and handed to the item parser in one call.
         """
         if self._peek_next_meaningful_line() != '[':
              print(f"Warning: Expected block '[' for property '{prop.name}', but not found.")
              return
         self._get_next_meaningful_line() # Consume '['
         
-        while True:
-            next_line = self._peek_next_meaningful_line()
-            if next_line is None or next_line == ']':
-                break
-            item_parser_func(self._get_next_meaningful_line(), prop)
+        block_lines = []
+        while (line := self._next_line_in_block()) is not None:
+            block_lines.append(line)
+        items_parser_func(block_lines, prop)
         
         if self._peek_next_meaningful_line() == ']':
             self._get_next_meaningful_line() # Consume ']'
             
-    def _parse_choice_item(self, line, prop: ChoicesProperty):
-        choice_match = re.match(r'^\s*("?[^"]+"?)\s*:\s*"([^"]+)"(?:\s*:\s*"((?:[^"]|\\")*)")?', line.strip())
-        if choice_match:
-            value, display_name, description = choice_match.groups()
-            prop.choices.append(ChoiceItem(value.strip('"'), display_name, description.replace('\\"', '"') if description else ""))
-        else:
-            print(f"Warning: Unrecognized line in choices block (skipped): {line}")
-
-    def _parse_flag_item(self, line, prop: FlagsProperty):
-        flag_match = re.match(r'^\s*(-?\d+)\s*:\s*"([^"]+)"(?:\s*:\s*(\d))?(?:\s*:\s*"((?:[^"]|\\")*)")?', line.strip())
-        if flag_match:
-            value, display_name, ticked, description = flag_match.groups()
-            ticked_bool = bool(int(ticked)) if ticked is not None else False
-            prop.flags.append(FlagItem(int(value), display_name, description.replace('\\"', '"') if description else "", ticked_bool))
-        else:
-            print(f"Warning: Unrecognized line in flags block (skipped): {line}")
\ No newline at end of file
+    def _parse_choice_items(self, lines, prop: ChoicesProperty):
+        # Block lines come from the pre-stripped line list, so they are matched as-is.
+        append = prop.choices.append
+        for line, choice_match in zip(lines, map(_CHOICE_RE.match, lines)):
+            if choice_match:
+                value, display_name, description = choice_match.groups()
+                if description and '\\' in description: description = description.replace('\\"', '"')
+                append(ChoiceItem(value.strip('"'), display_name, description or ""))
+            else:
+                print(f"Warning: Unrecognized line in choices block (skipped): {line}")
+
+    def _parse_flag_items(self, lines, prop: FlagsProperty):
+        append = prop.flags.append
+        for line, flag_match in zip(lines, map(_FLAG_RE.match, lines)):
+            if flag_match:
+                value, display_name, ticked, description = flag_match.groups()
+                ticked_bool = bool(int(ticked)) if ticked is not None else False
+                if description and '\\' in description: description = description.replace('\\"', '"')
+                append(FlagItem(int(value), display_name, description or "", ticked_bool))
+            else:
+                print(f"Warning: Unrecognized line in flags block (skipped): {line}")
+
+# Directive keyword (lowercased) -> FGDParser method that parses it.
+_DIRECTIVE_HANDLERS = {
+    '@include': FGDParser._parse_include,
+    '@mapsize': FGDParser._parse_mapsize,
+    '@version': FGDParser._parse_version,
+    '@materialexclusion': FGDParser._parse_material_exclusion,
+    '@autovisgroup': FGDParser._parse_autovisgroup,
+    **dict.fromkeys(('@pointclass', '@solidclass', '@baseclass', '@npcclass', '@keyframeclass',
+                     '@moveclass', '@filterclass', '@extendclass'), FGDParser._parse_entity_class),
+}
@@ -1,70 +1,140 @@
 # fgd_serializer.py
 
+import io
 import re
+from functools import lru_cache
 import fgd_model
 
+# Indentation is four spaces per level. Entities nest at most two levels deep, so their
+# writers index this table directly; AutoVisGroups can nest as deep as the file does.
+_INDENTS = tuple("    " * level for level in range(16))
+
+# Descriptions repeat heavily across entities and across save cycles, so the escaped
+# form is cached rather than recomputed for every element on every save.
+@lru_cache(maxsize=8192)
+def _escape_quotes(text: str) -> str:
+    """Escapes double quotes for use inside a quoted FGD string."""
+    return text.replace('"', '\\"')
+
+# Helpers such as size(...) and color(...) repeat across many classes and every save, and
+# the rendered text depends only on the key and its argument string.
+@lru_cache(maxsize=4096)
+def _format_helper(key: str, args: str) -> str:
+    # Special handling for potentially multi-line model helper
+    if '\n' in args:
+        # Indent the multi-line arguments for readability
+        indented_args = "\n".join([_INDENTS[1] + line.strip() for line in args.strip().split('\n')])
+        return f"{key}(\n{indented_args}\n)"
+    return f"{key}({args})"
+
+# Choice values and 'choices' defaults that look like plain numbers are written unquoted.
+_NUMERIC_RE = re.compile(r'^-?\d+(\.\d+)?$')
+
+def _is_plain_number(value: str) -> bool:
+    # Most choice values are bare non-negative integers, which isdecimal() settles without the regex.
+    return value.isdecimal() or _NUMERIC_RE.match(value) is not None
+
+# Property types whose default value is written unquoted.
+_NON_QUOTED_TYPES = frozenset({'integer', 'float', 'bool', 'angle', 'color255', 'vector', 'flags'})
+
+def _find_serializer(serializers: dict, cls: type):
+    """
+    Finds the writer for a subclass of a serialized model type by walking its MRO, and
+    caches it under cls so later instances hit the exact-type lookup. Returns None if no
+    base class has a writer.
+    """
+    for base in cls.__mro__[1:]:
+        serializer = serializers.get(base)
+        if serializer is not None:
+            serializers[cls] = serializer
+            return serializer
+    return None
+
 class FGDSerializer:
     """Serializes an FGDFile object into a formatted FGD text string."""
 
+    def __init__(self):
+        # Plain keyvalues are by far the most common, so each property type gets its own
+        # writer instead of every property going through the choices/flags checks.
+        self._property_serializers = {
+            fgd_model.KeyvalueProperty: self._serialize_keyvalue_property,
+            fgd_model.ChoicesProperty: self._serialize_choices_property,
+            fgd_model.FlagsProperty: self._serialize_flags_property,
+        }
+        # Top-level element writers, looked up by exact type instead of walking an isinstance
+        # chain for every element. Subclasses fall back to their base class's writer.
+        self._element_serializers = {
+            fgd_model.IncludeDirective: self._serialize_include_directive,
+            fgd_model.MapSize: self._serialize_mapsize,
+            fgd_model.Version: self._serialize_version,
+            fgd_model.MaterialExclusion: self._serialize_material_exclusion,
+            fgd_model.AutoVisGroup: self._serialize_autovisgroup,
+            fgd_model.EntityClass: self._serialize_entity_class,
+        }
+
     def serialize_fgd(self, fgd_file: fgd_model.FGDFile) -> str:
         """Converts an FGDFile object into a complete FGD string."""
+        buffer = io.StringIO()
+        self.serialize_fgd_to(fgd_file, buffer)
+        return buffer.getvalue()
+
+    def serialize_fgd_to(self, fgd_file: fgd_model.FGDFile, fp):
+        """
+        Writes the same text as serialize_fgd to a file-like object one top-level
+        element at a time, so the whole file is never held in memory as one string.
+        """
+        # Each element's writer appends its lines to one reused list, joined once per element.
+        serializers = self._element_serializers
         lines = []
+        wrote_any = False
         for element in fgd_file.elements:
-            if isinstance(element, fgd_model.IncludeDirective):
-                lines.append(self._serialize_include_directive(element))
-            elif isinstance(element, fgd_model.MapSize):
-                lines.append(self._serialize_mapsize(element))
-            elif isinstance(element, fgd_model.Version):
-                lines.append(self._serialize_version(element))
-            elif isinstance(element, fgd_model.MaterialExclusion):
-                lines.append(self._serialize_material_exclusion(element))
-            elif isinstance(element, fgd_model.AutoVisGroup):
-                lines.append(self._serialize_autovisgroup(element))
-            elif isinstance(element, fgd_model.EntityClass):
-                lines.append(self._serialize_entity_class(element))
+            serializer = serializers.get(type(element)) or _find_serializer(serializers, type(element))
+            # Elements with no writer emit nothing, not even a separating blank line.
+            if serializer is None:
+                print(f"Warning: No serializer for element type '{type(element).__name__}' (skipped): {element.name}")
+                continue
+            if wrote_any:
+                fp.write("\n")
+            serializer(element, lines)
             lines.append("") # Blank line between top-level elements
-        return "\n".join(lines)
+            fp.write("\n".join(lines))
+            lines.clear()
+            wrote_any = True
 
-    def _serialize_include_directive(self, include_dir: fgd_model.IncludeDirective) -> str:
-        return f'@include "{include_dir.file_path}"'
+    def _serialize_include_directive(self, include_dir: fgd_model.IncludeDirective, lines: list[str]):
+        lines.append(f'@include "{include_dir.file_path}"')
         
-    def _serialize_mapsize(self, map_size: fgd_model.MapSize) -> str:
-        return f'@mapsize({map_size.min_coord}, {map_size.max_coord})'
+    def _serialize_mapsize(self, map_size: fgd_model.MapSize, lines: list[str]):
+        lines.append(f'@mapsize({map_size.min_coord}, {map_size.max_coord})')
 
-    def _serialize_version(self, version: fgd_model.Version) -> str:
-        return f'@version({version.version_number})'
+    def _serialize_version(self, version: fgd_model.Version, lines: list[str]):
+        lines.append(f'@version({version.version_number})')
 
-    def _serialize_material_exclusion(self, mat_ex: fgd_model.MaterialExclusion) -> str:
-        lines = ["@MaterialExclusion", "["]
+    def _serialize_material_exclusion(self, mat_ex: fgd_model.MaterialExclusion, lines: list[str]):
+        lines.append("@MaterialExclusion")
+        lines.append("[")
         for path in mat_ex.excluded_paths:
             lines.append(f'    "{path}"')
         lines.append("]")
-        return "\n".join(lines)
 
-    def _serialize_autovisgroup(self, group: fgd_model.AutoVisGroup, indent_level=0) -> str:
-        indent = "    " * indent_level
-        lines = [f'{indent}@AutoVisGroup = "{group.parent_name}"', f"{indent}["]
+    def _serialize_autovisgroup(self, group: fgd_model.AutoVisGroup, lines: list[str], indent_level=0):
+        indent = _INDENTS[indent_level] if indent_level < len(_INDENTS) else "    " * indent_level
+        # Only the top-level group carries the directive; nested subgroups are just a quoted name.
+        if indent_level:
+            lines.append(f'{indent}"{group.parent_name}"')
+        else:
+            lines.append(f'{indent}@AutoVisGroup = "{group.parent_name}"')
+        lines.append(f"{indent}[")
         for child in group.children:
             if isinstance(child, fgd_model.AutoVisGroup):
                 # This is a nested subgroup
-                lines.append(self._serialize_autovisgroup_child(child, indent_level + 1))
+                self._serialize_autovisgroup(child, lines, indent_level + 1)
             else:
                 # This is an entity class name
                 lines.append(f'{indent}    "{child}"')
         lines.append(f"{indent}]")
-        return "\n".join(lines)
-    
-    def _serialize_autovisgroup_child(self, group: fgd_model.AutoVisGroup, indent_level: int) -> str:
-        indent = "    " * indent_level
-        lines = [f'{indent}"{group.parent_name}"', f"{indent}["]
-        for entity_name in group.children:
-            lines.append(f'{indent}    "{entity_name}"')
-        lines.append(f"{indent}]")
-        return "\n".join(lines)
 
-    def _serialize_entity_class(self, entity_class: fgd_model.EntityClass) -> str:
-        class_lines = []
-        
+    def _serialize_entity_class(self, entity_class: fgd_model.EntityClass, class_lines: list[str]):
         # Header: @ClassType base(...) color(...) etc. = name : "description"
         header_parts = [f"@{entity_class.class_type}"]
         if entity_class.base_classes:
@@ -72,21 +142,14 @@ class FGDSerializer:
         
         # Serialize all helpers from the dictionary
         for key, args in entity_class.helpers.items():
-            # Special handling for potentially multi-line model helper
-            if '\n' in args:
-                # Indent the multi-line arguments for readability
-                indented_args = "\n".join([" " * 4 + line.strip() for line in args.strip().split('\n')])
-                header_parts.append(f"{key}(\n{indented_args}\n)")
-            else:
-                header_parts.append(f"{key}({args})")
-        
-        # Escape quotes in description for serialization and handle multiline
-        description = entity_class.description.replace('"', '\\"')
+            header_parts.append(_format_helper(key, args))
         
         header_line = " ".join(header_parts)
         header_line += f' = {entity_class.name}'
 
-        if description:
+        if entity_class.description:
+            # Escape quotes in description for serialization and handle multiline
+            description = _escape_quotes(entity_class.description)
             # Join multiline descriptions with the '+' character as per FGD spec for older tools
             if '\n' in description:
                 description_lines = description.split('\n')
@@ -106,106 +169,92 @@ class FGDSerializer:
         for io in entity_class.outputs:
             class_lines.append(self._serialize_io(io, 1))
         for prop in entity_class.properties:
-            class_lines.extend(self._serialize_property(prop, 1))
+            self._serialize_property(prop, class_lines, 1)
 
         class_lines.append("]")
-        return "\n".join(class_lines)
 
     def _serialize_io(self, io_obj: fgd_model.IO, indent_level: int) -> str:
-        indent = "    " * indent_level
-        desc = io_obj.description.replace('"', '\\"')
-        line = f'{indent}{io_obj.io_type} {io_obj.name}({io_obj.arg_type})'
-        if desc:
-            line += f' : "{desc}"'
-        return line
-
-    def _serialize_property(self, prop: fgd_model.Property, indent_level: int) -> list[str]:
-        indent = "    " * indent_level
-        prop_lines = []
-
-        prop_header = f"{indent}{prop.name}({prop.prop_type})"
-        if prop.readonly: prop_header += " readonly"
-        if prop.report: prop_header += " report"
-
-        # --- FIX ---
-        # Logic to conditionally quote the default value based on property type.
-        # Numeric/vector types should not be quoted. String types should be.
+        indent = _INDENTS[indent_level]
+        description = io_obj.description
+        if description:
+            return f'{indent}{io_obj.io_type} {io_obj.name}({io_obj.arg_type}) : "{_escape_quotes(description)}"'
+        return f'{indent}{io_obj.io_type} {io_obj.name}({io_obj.arg_type})'
+
+    def _serialize_property(self, prop: fgd_model.Property, prop_lines: list[str], indent_level: int):
+        serializers = self._property_serializers
+        # Subclasses use their base type's writer; only properties matching none are plain keyvalues.
+        serializer = serializers.get(type(prop)) or _find_serializer(serializers, type(prop)) \
+            or self._serialize_keyvalue_property
+        serializer(prop, prop_lines, indent_level)
+
+    def _serialize_keyvalue_property(self, prop: fgd_model.Property, prop_lines: list[str], indent_level: int):
+        prop_lines.append(self._serialize_property_header(prop, _INDENTS[indent_level]))
+
+    def _serialize_choices_property(self, prop: fgd_model.ChoicesProperty, prop_lines: list[str], indent_level: int):
+        self._serialize_block_property(prop, prop.choices, self._serialize_choice_item, prop_lines, indent_level)
+
+    def _serialize_flags_property(self, prop: fgd_model.FlagsProperty, prop_lines: list[str], indent_level: int):
+        self._serialize_block_property(prop, prop.flags, self._serialize_flag_item, prop_lines, indent_level)
+
+    def _serialize_block_property(self, prop: fgd_model.Property, items: list, item_serializer, prop_lines: list[str], indent_level: int):
+        indent = _INDENTS[indent_level]
+        prop_header = self._serialize_property_header(prop, indent)
+        if not items:
+            prop_lines.append(prop_header)
+            return
+
+        prop_lines.append(prop_header + " =")
+        prop_lines.append(f"{indent}[")
+        for item in items:
+            prop_lines.append(item_serializer(item, indent_level + 1))
+        prop_lines.append(f"{indent}]")
+
+    def _serialize_property_header(self, prop: fgd_model.Property, indent: str) -> str:
+        prop_type, display_name, default_value, description = \
+            prop.prop_type, prop.display_name, prop.default_value, prop.description
+        prop_header = f"{indent}{prop.name}({prop_type}){' readonly' if prop.readonly else ''}{' report' if prop.report else ''}"
+
+        # Numeric/vector types should not have their default quoted. String types should be.
         # 'choices' is a special case that can have numeric or string defaults.
-        non_quoted_types = {'integer', 'float', 'bool', 'angle', 'color255', 'vector', 'flags'}
-        base_prop_type = prop.prop_type.split(',')[0].strip().lower()
-        
-        quote_default = True # Default to quoting
-        if base_prop_type in non_quoted_types:
+        base_prop_type = fgd_model.base_prop_type(prop_type)
+        if base_prop_type in _NON_QUOTED_TYPES:
             quote_default = False
-        # For 'choices', only quote if the value is not a plain number.
         elif base_prop_type == 'choices':
-            if prop.default_value and re.match(r'^-?\d+(\.\d+)?$', prop.default_value):
-                quote_default = False
+            # For 'choices', only quote if the value is not a plain number.
+            quote_default = not (default_value and _is_plain_number(default_value))
+        else:
+            quote_default = True
 
         # Header: ... : "DisplayName" : "DefaultValue" : "Description"
-        details = []
         # FGD format requires all preceding colons.
-        if prop.description:
-            display_str = f'"{prop.display_name}"'
-            
-            val_to_use = prop.default_value
+        if description:
             # For non-quoted types, if the value is empty, use "0" as a safe default
             # because an empty value is not valid for a number if a description is present.
-            if not quote_default and not val_to_use:
-                val_to_use = "0"
-            
-            default_val_str = f'"{val_to_use}"' if quote_default else str(val_to_use)
-            desc_str = f'"{prop.description.replace("\"", "\\\"")}"'
-            details = [display_str, default_val_str, desc_str]
-        elif prop.default_value:
-            display_str = f'"{prop.display_name}"'
-            default_val_str = f'"{prop.default_value}"' if quote_default else str(prop.default_value)
-            details = [display_str, default_val_str]
-        elif prop.display_name:
-            display_str = f'"{prop.display_name}"'
-            details = [display_str]
-        
-        if details:
-            prop_header += " : " + " : ".join(details)
-        
-        # --- (End of fix section) ---
-        
-        is_block_prop = (isinstance(prop, fgd_model.ChoicesProperty) and prop.choices) or \
-                        (isinstance(prop, fgd_model.FlagsProperty) and prop.flags)
-        
-        if is_block_prop:
-            prop_header += " ="
-
-        prop_lines.append(prop_header)
-
-        # Blocks for choices or flags
-        if isinstance(prop, fgd_model.ChoicesProperty) and prop.choices:
-            prop_lines.append(f"{indent}[")
-            for choice in prop.choices:
-                prop_lines.append(self._serialize_choice_item(choice, indent_level + 1))
-            prop_lines.append(f"{indent}]")
-        elif isinstance(prop, fgd_model.FlagsProperty) and prop.flags:
-            prop_lines.append(f"{indent}[")
-            for flag in prop.flags:
-                prop_lines.append(self._serialize_flag_item(flag, indent_level + 1))
-            prop_lines.append(f"{indent}]")
-            
-        return prop_lines
+            if not quote_default and not default_value:
+                default_value = "0"
+            default_str = f'"{default_value}"' if quote_default else default_value
+            return f'{prop_header} : "{display_name}" : {default_str} : "{_escape_quotes(description)}"'
+        if default_value:
+            default_str = f'"{default_value}"' if quote_default else default_value
+            return f'{prop_header} : "{display_name}" : {default_str}'
+        if display_name:
+            return f'{prop_header} : "{display_name}"'
+        return prop_header
 
     def _serialize_choice_item(self, choice: fgd_model.ChoiceItem, indent_level: int) -> str:
-        indent = "    " * indent_level
+        indent = _INDENTS[indent_level]
         
         # Quote value if it's not a plain number
-        val_str = f'"{choice.value}"' if not re.match(r'^-?\d+(\.\d+)?$', choice.value) else choice.value
+        val_str = choice.value if _is_plain_number(choice.value) else f'"{choice.value}"'
 
-        line = f'{indent}{val_str} : "{choice.display_name}"'
-        if choice.description:
-            line += f' : "{choice.description.replace("\"", "\\\"")}"'
-        return line
+        description = choice.description
+        if description:
+            return f'{indent}{val_str} : "{choice.display_name}" : "{_escape_quotes(description)}"'
+        return f'{indent}{val_str} : "{choice.display_name}"'
 
     def _serialize_flag_item(self, flag: fgd_model.FlagItem, indent_level: int) -> str:
-        indent = "    " * indent_level
-        line = f'{indent}{flag.value} : "{flag.display_name}" : {int(flag.default_ticked)}'
-        if flag.description:
-            line += f' : "{flag.description.replace("\"", "\\\"")}"'
-        return line
\ No newline at end of file
+        indent = _INDENTS[indent_level]
+        description = flag.description
+        if description:
+            return f'{indent}{flag.value} : "{flag.display_name}" : {int(flag.default_ticked)} : "{_escape_quotes(description)}"'
+        return f'{indent}{flag.value} : "{flag.display_name}" : {int(flag.default_ticked)}'
\ No newline at end of file
@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 
+import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
 
+# Large files are fed to the Text widget in pieces of this many characters,
+# so Tk can redraw between them instead of freezing on one huge insert.
+LOAD_CHUNK_SIZE = 64 * 1024
+
 class Notepad:
     def __init__(self, root):
         """
@@ -17,8 +22,9 @@ class Notepad:
         self.current_file_path = None # To store the path of the currently open file
 
         # --- Text Area ---
-        # Using scrolledtext for automatic scrollbars
-        self.text_area = scrolledtext.ScrolledText(self.root, wrap=tk.WORD, undo=True)
+        # Using scrolledtext for automatic scrollbars.
+        # Tk keeps unlimited undo by default; cap it so long sessions don't grow memory without bound.
+        self.text_area = scrolledtext.ScrolledText(self.root, wrap=tk.WORD, undo=True, maxundo=1000)
         self.text_area.pack(expand=True, fill='both')
         self.text_area.focus_set() # Set focus to the text area
 
@@ -87,7 +93,7 @@ class Notepad:
     def update_title(self, filepath=None):
         """Updates the window title with the current file name."""
         if filepath:
-            filename = filepath.split('/')[-1] # Get filename from path
+            filename = os.path.basename(filepath) # Handles both '/' and '\\' separators on Windows
             self.root.title(f"{filename} - Imhotep")
         else:
             self.root.title("Untitled - Imhotep")
@@ -129,8 +135,11 @@ class Notepad:
             try:
                 with open(filepath, "r", encoding='utf-8') as file:
                     content = file.read()
-                    self.text_area.delete(1.0, tk.END)
-                    self.text_area.insert(tk.END, content)
+                self.text_area.delete(1.0, tk.END)
+                for start in range(0, len(content), LOAD_CHUNK_SIZE):
+                    self.text_area.insert(tk.END, content[start:start + LOAD_CHUNK_SIZE])
+                    self.text_area.update_idletasks()
+                self.text_area.edit_reset() # Undo shouldn't step back through the pieces of the load
                 self.current_file_path = filepath
                 self.update_title(filepath)
                 self.status_bar.config(text=f"Opened: {filepath}")
@@ -143,10 +152,8 @@ class Notepad:
         """Saves the current content to the current file path, or asks for a path if new."""
         if self.current_file_path:
             try:
-                content = self.text_area.get(1.0, tk.END)
-                # Tkinter text widget adds a newline at the end, remove if it's the only content or unwanted
-                if content.endswith('\n') and content.count('\n') == content.count(1.0, tk.END + "-1c"):
-                     content = content.rstrip('\n')
+                # "end-1c" leaves out the newline the Text widget always keeps after the last line
+                content = self.text_area.get("1.0", "end-1c")
 
                 with open(self.current_file_path, "w", encoding='utf-8') as file:
                     file.write(content)
@@ -169,13 +176,7 @@ class Notepad:
         )
         if filepath:
             try:
-                content = self.text_area.get(1.0, tk.END)
-                # Tkinter text widget might add an extra newline at the very end.
-                # Only remove it if it's the *very last* character and seems unintentional.
-                if content.endswith('\n') and len(content) > 1: # Check if it's not just a single newline
-                    # A more robust check might be needed depending on desired behavior for files ending with newlines
-                    pass # For now, let's keep it simple and save as is.
-                         # Or: content = content.rstrip('\n') if you always want to strip trailing newlines.
+                content = self.text_area.get("1.0", "end-1c") # Without the widget's implicit trailing newline
 
                 with open(filepath, "w", encoding='utf-8') as file:
                     file.write(content)
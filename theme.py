@@ -11,74 +11,88 @@ DARK_ENTRY_BG = "#3c3c3c"
 BLUE_ACCENT = "#5a9cf8"
 WHITE = "#ffffff"
 
+# --- Dark Theme ---
+# ttk style settings for the dark theme, built once at import and registered by setup_theme.
+DARK_THEME_SETTINGS = {
+    ".": {
+        "configure": {
+            "background": DARK_BACKGROUND,
+            "foreground": DARK_FOREGROUND,
+            "bordercolor": "#555555",
+            "darkcolor": DARK_BACKGROUND,
+            "lightcolor": DARK_MID_TONE,
+            "troughcolor": DARK_ENTRY_BG,
+            "selectbackground": BLUE_ACCENT,
+            "selectforeground": WHITE
+        }
+    },
+    "TButton": {
+        "configure": {"background": DARK_MID_TONE, "foreground": DARK_FOREGROUND, "padding": 5, "relief": "flat", "borderwidth": 1},
+        "map": {"background": [("active", BLUE_ACCENT), ("disabled", DARK_ENTRY_BG)], "foreground": [("active", WHITE)]}
+    },
+    "TEntry": {
+        "configure": {"fieldbackground": DARK_ENTRY_BG, "foreground": DARK_FOREGROUND, "insertcolor": WHITE, "borderwidth": 1, "relief": "flat"}
+    },
+    "TCombobox": {
+        "configure": {"fieldbackground": DARK_ENTRY_BG, "background": DARK_MID_TONE, "foreground": DARK_FOREGROUND, "arrowcolor": DARK_FOREGROUND},
+        "map": {"background": [("readonly", DARK_MID_TONE)], "fieldbackground": [("readonly", DARK_ENTRY_BG)], "foreground": [("readonly", DARK_FOREGROUND)]}
+    },
+    "TLabel": {"configure": {"background": DARK_BACKGROUND, "foreground": DARK_FOREGROUND}},
+    "TFrame": {"configure": {"background": DARK_BACKGROUND}},
+    "Treeview": {
+        "configure": {"background": DARK_ENTRY_BG, "fieldbackground": DARK_ENTRY_BG, "foreground": DARK_FOREGROUND},
+        "map": {"background": [("selected", BLUE_ACCENT)], "foreground": [("selected", WHITE)]}
+    },
+    "Treeview.Heading": {
+        "configure": {"background": DARK_MID_TONE, "foreground": DARK_FOREGROUND, "relief": "flat"},
+        "map": {"background": [("active", BLUE_ACCENT)]}
+    },
+    "Vertical.TScrollbar": {
+        "configure": {"background": DARK_MID_TONE, "troughcolor": DARK_ENTRY_BG, "bordercolor": "#555555", "arrowcolor": DARK_FOREGROUND},
+        "map": {"background": [("active", BLUE_ACCENT)]}
+    },
+    "TLabelframe": {"configure": {"background": DARK_BACKGROUND, "foreground": DARK_FOREGROUND}},
+    "TLabelframe.Label": {"configure": {"background": DARK_BACKGROUND, "foreground": DARK_FOREGROUND}},
+    "TCheckbutton": {
+        "configure": {"background": DARK_BACKGROUND, "foreground": DARK_FOREGROUND},
+        "map": {
+            "background": [("active", DARK_BACKGROUND)],
+            "indicatorbackground": [("!selected", DARK_MID_TONE), ("selected", BLUE_ACCENT)],
+            "indicatorcolor": [("selected", WHITE)]
+        }
+    },
+    "TPanedwindow": {"configure": {"background": DARK_BACKGROUND}}
+}
+
 def setup_theme(app):
     """
     Initializes and configures the ttk theme for the application.
     This function defines a custom dark theme and sets it as the default.
     """
-    style = ttk.Style(app)
+    # Reuse the app's Style if it already has one, and keep it there for switch_theme.
+    style = getattr(app, 'style', None) or ttk.Style(app)
+    app.style = style
 
     # --- Create the Dark Theme ---
-    # Using the 'clam' theme as a base for customization.
-    style.theme_create("dark_theme", parent="clam", settings={
-        ".": {
-            "configure": {
-                "background": DARK_BACKGROUND,
-                "foreground": DARK_FOREGROUND,
-                "bordercolor": "#555555",
-                "darkcolor": DARK_BACKGROUND,
-                "lightcolor": DARK_MID_TONE,
-                "troughcolor": DARK_ENTRY_BG,
-                "selectbackground": BLUE_ACCENT,
-                "selectforeground": WHITE
-            }
-        },
-        "TButton": {
-            "configure": {"background": DARK_MID_TONE, "foreground": DARK_FOREGROUND, "padding": 5, "relief": "flat", "borderwidth": 1},
-            "map": {"background": [("active", BLUE_ACCENT), ("disabled", DARK_ENTRY_BG)], "foreground": [("active", WHITE)]}
-        },
-        "TEntry": {
-            "configure": {"fieldbackground": DARK_ENTRY_BG, "foreground": DARK_FOREGROUND, "insertcolor": WHITE, "borderwidth": 1, "relief": "flat"}
-        },
-        "TCombobox": {
-            "configure": {"fieldbackground": DARK_ENTRY_BG, "background": DARK_MID_TONE, "foreground": DARK_FOREGROUND, "arrowcolor": DARK_FOREGROUND},
-            "map": {"background": [("readonly", DARK_MID_TONE)], "fieldbackground": [("readonly", DARK_ENTRY_BG)], "foreground": [("readonly", DARK_FOREGROUND)]}
-        },
-        "TLabel": {"configure": {"background": DARK_BACKGROUND, "foreground": DARK_FOREGROUND}},
-        "TFrame": {"configure": {"background": DARK_BACKGROUND}},
-        "Treeview": {
-            "configure": {"background": DARK_ENTRY_BG, "fieldbackground": DARK_ENTRY_BG, "foreground": DARK_FOREGROUND},
-            "map": {"background": [("selected", BLUE_ACCENT)], "foreground": [("selected", WHITE)]}
-        },
-        "Treeview.Heading": {
-            "configure": {"background": DARK_MID_TONE, "foreground": DARK_FOREGROUND, "relief": "flat"},
-            "map": {"background": [("active", BLUE_ACCENT)]}
-        },
-        "Vertical.TScrollbar": {
-            "configure": {"background": DARK_MID_TONE, "troughcolor": DARK_ENTRY_BG, "bordercolor": "#555555", "arrowcolor": DARK_FOREGROUND},
-            "map": {"background": [("active", BLUE_ACCENT)]}
-        },
-        "TLabelframe": {"configure": {"background": DARK_BACKGROUND, "foreground": DARK_FOREGROUND}},
-        "TLabelframe.Label": {"configure": {"background": DARK_BACKGROUND, "foreground": DARK_FOREGROUND}},
-        "TCheckbutton": {
-            "configure": {"background": DARK_BACKGROUND, "foreground": DARK_FOREGROUND},
-            "map": {
-                "background": [("active", DARK_BACKGROUND)],
-                "indicatorbackground": [("!selected", DARK_MID_TONE), ("selected", BLUE_ACCENT)],
-                "indicatorcolor": [("selected", WHITE)]
-            }
-        },
-        "TPanedwindow": {"configure": {"background": DARK_BACKGROUND}}
-    })
+    # Using the 'clam' theme as a base for customization. Tk refuses to create a theme
+    # twice, so repeated calls only re-apply it.
+    if "dark_theme" not in style.theme_names():
+        style.theme_create("dark_theme", parent="clam", settings=DARK_THEME_SETTINGS)
 
     # Set the dark theme as the default
     style.theme_use("dark_theme")
     app.configure(background=DARK_BACKGROUND)
+    # Menus and canvas haven't been colored for this theme yet, so the next switch_theme must run in full.
+    app.dark_mode = None
 
 def switch_theme(app, dark_mode: bool):
     """
     Switches the application's theme and updates core widgets.
+    Returns False without touching any widget if that mode is already applied.
     """
+    if getattr(app, 'dark_mode', None) == dark_mode:
+        return False
+
     style = app.style
     if dark_mode:
         style.theme_use("dark_theme")
@@ -95,17 +109,26 @@ def switch_theme(app, dark_mode: bool):
     # --- Update Menu Colors ---
     # The menu widget is part of the core tk library, so it must be configured manually.
     app.menubar.config(bg=bg, fg=fg, activebackground=abg, activeforeground=afg, relief="flat")
-    # Iterate through each cascade menu and apply the theme
-    for i in range(app.menubar.index("end") + 1):
-        try:
-            menu = app.menubar.nametowidget(app.menubar.entrycget(i, "menu"))
+    # Apply the theme to each cascade menu. Apps that record their cascades skip
+    # the per-entry menubar queries; otherwise they are discovered from the menubar.
+    cascade_menus = getattr(app, 'cascade_menus', None)
+    if cascade_menus is not None:
+        for menu in cascade_menus:
             menu.config(bg=bg, fg=fg, activebackground=abg, activeforeground=afg, relief="flat")
-        except (tk.TclError, AttributeError):
-            # This handles separators or non-cascade menu items
-            pass
+    else:
+        for i in range(app.menubar.index("end") + 1):
+            try:
+                menu = app.menubar.nametowidget(app.menubar.entrycget(i, "menu"))
+                menu.config(bg=bg, fg=fg, activebackground=abg, activeforeground=afg, relief="flat")
+            except (tk.TclError, AttributeError):
+                # This handles separators or non-cascade menu items
+                pass
 
     # --- Update Canvas Background ---
     # The Canvas is also a core tk widget.
     if hasattr(app, 'properties_canvas'):
         canvas_bg = style.lookup("TFrame", "background")
-        app.properties_canvas.config(bg=canvas_bg)
\ No newline at end of file
+        app.properties_canvas.config(bg=canvas_bg)
+
+    app.dark_mode = dark_mode
+    return True
\ No newline at end of file
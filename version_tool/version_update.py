@@ -6,12 +6,17 @@ All code in this folder ("version_tool") is free and unencumbered software relea
 Refer to LICENSE file if you have any concerns.
 """
 
+import os
 import re
 import sys
 import subprocess
 
 file_path = 'build_version_info.bat'
 
+# Version parts from most to least significant; bumping one resets every part after it.
+VERSION_KEYS = ('MAJOR', 'MINOR', 'PATCH', 'BUILD')
+VERSION_RE = re.compile(rf"set ({'|'.join(VERSION_KEYS)})=(\d+)")
+
 def increment_version(version_part):
     """
     Increments the specified version number (MAJOR, MINOR, PATCH, or BUILD) in build_version_info.bat.
@@ -23,50 +28,48 @@ def increment_version(version_part):
         print(f"Error: The file '{file_path}' was not found.")
         sys.exit(1)
 
-    # Use a regular expression to find the version numbers
-    major_match = re.search(r"set MAJOR=(\d+)", content)
-    minor_match = re.search(r"set MINOR=(\d+)", content)
-    patch_match = re.search(r"set PATCH=(\d+)", content)
-    build_match = re.search(r"set BUILD=(\d+)", content)
+    # Use a regular expression to find the version numbers.
+    # Only the first assignment of each part counts, both when reading and when rewriting.
+    matches = {}
+    for match in VERSION_RE.finditer(content):
+        matches.setdefault(match.group(1), match)
 
-    if not all([major_match, minor_match, patch_match, build_match]):
+    if len(matches) != len(VERSION_KEYS):
         print("Error: Could not find all MAJOR, MINOR, PATCH, and BUILD variables in the file.")
         sys.exit(1)
 
-    major = int(major_match.group(1))
-    minor = int(minor_match.group(1))
-    patch = int(patch_match.group(1))
-    build = int(build_match.group(1))
+    versions = {key: int(match.group(2)) for key, match in matches.items()}
 
-    if version_part == 'major':
-        major += 1
-        minor = 0
-        patch = 0
-        build = 0
-    elif version_part == 'minor':
-        minor += 1
-        patch = 0
-        build = 0
-    elif version_part == 'patch':
-        patch += 1
-        build = 0
-    elif version_part == 'build':
-        build += 1
-    else:
+    key_to_increment = version_part.upper()
+    if key_to_increment not in versions:
         print(f"Error: Invalid argument '{version_part}'. Use 'major', 'minor', 'patch', or 'build'.")
         sys.exit(1)
 
+    versions[key_to_increment] += 1
+    for key in VERSION_KEYS[VERSION_KEYS.index(key_to_increment) + 1:]:
+        versions[key] = 0
+
     # Replace the old version numbers with the new ones
-    new_content = re.sub(r"set MAJOR=\d+", f"set MAJOR={major}", content, count=1)
-    new_content = re.sub(r"set MINOR=\d+", f"set MINOR={minor}", new_content, count=1)
-    new_content = re.sub(r"set PATCH=\d+", f"set PATCH={patch}", new_content, count=1)
-    new_content = re.sub(r"set BUILD=\d+", f"set BUILD={build}", new_content, count=1)
+    first_starts = {match.start() for match in matches.values()}
+    def replace_version(match):
+        if match.start() in first_starts:
+            return f"set {match.group(1)}={versions[match.group(1)]}"
+        return match.group(0)
+    new_content = VERSION_RE.sub(replace_version, content)
 
-    # Write the updated content back to the file
-    with open(file_path, 'w') as file:
-        file.write(new_content)
+    # Write the updated content next to the file, then swap it in, so an interrupted
+    # write can never leave a truncated build_version_info.bat behind.
+    temp_path = file_path + '.tmp'
+    try:
+        with open(temp_path, 'w') as file:
+            file.write(new_content)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
 
-    print(f"Version updated to: {major}.{minor}.{patch}.{build}")
+    print(f"Version updated to: {'.'.join(str(versions[key]) for key in VERSION_KEYS)}")
 
 if __name__ == "__main__":
     if len(sys.argv) < 2: